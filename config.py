@@ -37,8 +37,47 @@ class PyroConf(object):
     MAX_CONCURRENT_TRANSMISSIONS = int(getenv("MAX_CONCURRENT_TRANSMISSIONS", "3"))
     # Max number of files to download simultaneously in batch mode
     MAX_CONCURRENT_DOWNLOADS = int(getenv("MAX_CONCURRENT_DOWNLOADS", "3"))
+    # Files of at least this size (MB) may only use MAX_CONCURRENT_DOWNLOADS - SMALL_FILE_SLOTS slots (0 = off)
+    LARGE_FILE_THRESHOLD_MB = int(getenv("LARGE_FILE_THRESHOLD_MB", "100"))
+    # Download slots kept free for smaller files while large ones are running
+    SMALL_FILE_SLOTS = int(getenv("SMALL_FILE_SLOTS", "1"))
+    # Media group items downloaded in parallel per album
+    ALBUM_CONCURRENCY = int(getenv("ALBUM_CONCURRENCY", "3"))
+    # Total size (MB) of files being downloaded at once, across all posts and albums
+    TRANSFER_BUDGET_MB = int(getenv("TRANSFER_BUDGET_MB", "4096"))
+    # Free space (MB) always left on the download volume; downloads that would cut into it wait
+    DISK_SAFETY_MARGIN_MB = int(getenv("DISK_SAFETY_MARGIN_MB", "1024"))
     BATCH_SIZE = int(getenv("BATCH_SIZE", "10"))
-    FLOOD_WAIT_DELAY = int(getenv("FLOOD_WAIT_DELAY", "3"))
+    # Bandwidth caps in MB/s for all transfers together and for each user (0 = unlimited)
+    BANDWIDTH_LIMIT_MBPS = float(getenv("BANDWIDTH_LIMIT_MBPS", "0"))
+    USER_BANDWIDTH_LIMIT_MBPS = float(getenv("USER_BANDWIDTH_LIMIT_MBPS", "0"))
+    # Seconds between edits of a progress message (all transfers share one update loop)
+    PROGRESS_UPDATE_INTERVAL = int(getenv("PROGRESS_UPDATE_INTERVAL", "5"))
+    # Split a /bdl range across every pool session that can see the chat (users without own session)
+    BATCH_SHARDING = getenv("BATCH_SHARDING", "True").lower() == "true"
+
+    # Stream videos/audio/documents from download straight into upload instead of staging on disk
+    STREAM_MODE = getenv("STREAM_MODE", "False").lower() == "true"
+    # Number of 512 KB upload parts buffered in memory per streamed transfer
+    STREAM_BUFFER_PARTS = int(getenv("STREAM_BUFFER_PARTS", "8"))
+    # Upload album items as soon as each finishes downloading, then send the album
+    ALBUM_PIPELINE = getenv("ALBUM_PIPELINE", "True").lower() == "true"
+
+    # Adaptive rate limiting for Telegram API calls (requests/second per client and method class)
+    # The rate grows by RATE_LIMIT_STEP on every success and halves on every FloodWait
+    RATE_LIMIT_INITIAL = float(getenv("RATE_LIMIT_INITIAL", "5"))
+    RATE_LIMIT_MIN = float(getenv("RATE_LIMIT_MIN", "0.2"))
+    RATE_LIMIT_MAX = float(getenv("RATE_LIMIT_MAX", "30"))
+    RATE_LIMIT_STEP = float(getenv("RATE_LIMIT_STEP", "0.1"))
+
+    # Cache of uploaded files (source file_unique_id -> bot file_id) for instant re-sends
+    FILE_CACHE_MEMORY_SIZE = int(getenv("FILE_CACHE_MEMORY_SIZE", "1000"))
+    FILE_CACHE_MAX_ENTRIES = int(getenv("FILE_CACHE_MAX_ENTRIES", "50000"))
+    # ffmpeg / ffprobe subprocesses allowed at once, and their default timeout in seconds
+    MEDIA_TOOL_WORKERS = int(getenv("MEDIA_TOOL_WORKERS", "2"))
+    MEDIA_TOOL_TIMEOUT = int(getenv("MEDIA_TOOL_TIMEOUT", "120"))
+    # Video thumbnails kept on disk by source file_unique_id (0 disables the cache)
+    THUMB_CACHE_SIZE = int(getenv("THUMB_CACHE_SIZE", "200"))
 
     # Forward channel configuration - Bot must be admin in this channel
     FORWARD_CHANNEL_ID = int(getenv("FORWARD_CHANNEL_ID", "0"))
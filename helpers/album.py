@@ -0,0 +1,90 @@
+# Copyright (C) @TheSmartBisnu
+# Pipelined media group upload: items are pre-uploaded as soon as they finish downloading
+
+from pyrogram import raw, utils
+
+from helpers.msg import get_document_attributes, get_file_name, get_media
+
+
+async def preupload_album_item(bot, peer, chat_message, source, cached=False, progress=None, progress_args=()):
+    """
+    Upload one album item with messages.uploadMedia, before the album is sent.
+
+    Args:
+        peer: Resolved peer of the chat the album will be sent to
+        source: Local file path, or the cached file_id if `cached` is True
+        progress: Upload progress callback, called like Pyrogram's (also applies bandwidth limits)
+
+    Returns:
+        Raw InputMediaPhoto / InputMediaDocument referencing the uploaded file
+    """
+    if cached:
+        return utils.get_input_media_from_file_id(source)
+
+    file = await bot.save_file(source, progress=progress, progress_args=progress_args)
+
+    if chat_message.photo:
+        uploaded = await bot.invoke(raw.functions.messages.UploadMedia(
+            peer=peer,
+            media=raw.types.InputMediaUploadedPhoto(file=file)
+        ))
+        return raw.types.InputMediaPhoto(id=raw.types.InputPhoto(
+            id=uploaded.photo.id,
+            access_hash=uploaded.photo.access_hash,
+            file_reference=uploaded.photo.file_reference
+        ))
+
+    media_type = "video" if chat_message.video else "audio" if chat_message.audio else "document"
+    media = get_media(chat_message)
+    uploaded = await bot.invoke(raw.functions.messages.UploadMedia(
+        peer=peer,
+        media=raw.types.InputMediaUploadedDocument(
+            file=file,
+            mime_type=getattr(media, "mime_type", None) or "application/octet-stream",
+            attributes=get_document_attributes(
+                chat_message, media_type, get_file_name(chat_message.id, chat_message)
+            )
+        )
+    ))
+    return raw.types.InputMediaDocument(id=raw.types.InputDocument(
+        id=uploaded.document.id,
+        access_hash=uploaded.document.access_hash,
+        file_reference=uploaded.document.file_reference
+    ))
+
+
+async def send_preuploaded_album(bot, chat_id, items):
+    """
+    Send an album whose items were already uploaded.
+
+    Args:
+        items: List of (raw InputMedia, caption) in album order
+
+    Returns:
+        List[Message]: The sent messages
+    """
+    multi_media = []
+    for raw_media, caption in items:
+        text = await utils.parse_text_entities(bot, caption or "", bot.parse_mode, None)
+        multi_media.append(raw.types.InputSingleMedia(
+            media=raw_media,
+            random_id=bot.rnd_id(),
+            **text
+        ))
+
+    r = await bot.invoke(raw.functions.messages.SendMultiMedia(
+        peer=await bot.resolve_peer(chat_id),
+        multi_media=multi_media
+    ))
+
+    return await utils.parse_messages(
+        bot,
+        raw.types.messages.Messages(
+            messages=[
+                update.message for update in r.updates
+                if isinstance(update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage))
+            ],
+            users=r.users,
+            chats=r.chats
+        )
+    )
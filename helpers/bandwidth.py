@@ -0,0 +1,100 @@
+# Copyright (C) @TheSmartBisnu
+# Token-bucket bandwidth shaper for downloads and uploads
+
+import asyncio
+from time import monotonic
+from typing import Dict, Optional
+
+from config import PyroConf
+from logger import LOGGER
+
+MB = 1024 * 1024
+
+
+class TokenBucket:
+    """
+    Byte-rate limiter. Transfers may run into debt by one chunk and then sleep it off,
+    so chunk sizes never have to fit into the bucket. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = monotonic()
+        self.lock = asyncio.Lock()
+
+    def set_rate(self, rate: float):
+        self.rate = rate
+        self.tokens = min(self.tokens, rate)
+
+    async def consume(self, nbytes: int):
+        if self.rate <= 0 or nbytes <= 0:
+            return
+        async with self.lock:
+            now = monotonic()
+            # Allow at most one second of burst
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= nbytes
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class BandwidthShaper:
+    """
+    Caps transfer bandwidth globally and per user.
+
+    Every chunk reported by a download or upload draws from the global bucket and
+    from its owner's bucket. Limits are in bytes/second and can be changed at runtime.
+    """
+
+    def __init__(self, global_rate: float, user_rate: float):
+        self.global_bucket = TokenBucket(global_rate)
+        self.user_rate = user_rate
+        self.user_overrides: Dict[int, float] = {}
+        self.user_buckets: Dict[int, TokenBucket] = {}
+
+    def _user_bucket(self, user_id: int) -> TokenBucket:
+        bucket = self.user_buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self.user_overrides.get(user_id, self.user_rate))
+            self.user_buckets[user_id] = bucket
+        return bucket
+
+    async def throttle(self, nbytes: int, user_id: Optional[int] = None):
+        """Wait until `nbytes` more bytes may be transferred"""
+        if user_id is not None:
+            await self._user_bucket(user_id).consume(nbytes)
+        await self.global_bucket.consume(nbytes)
+
+    def set_global_limit(self, rate: float):
+        self.global_bucket.set_rate(rate)
+        LOGGER(__name__).info(f"Global bandwidth limit set to {rate / MB:.1f} MB/s")
+
+    def set_user_limit(self, rate: float, user_id: Optional[int] = None):
+        """Set the default per-user limit, or override it for one user"""
+        if user_id is None:
+            self.user_rate = rate
+            for uid, bucket in self.user_buckets.items():
+                if uid not in self.user_overrides:
+                    bucket.set_rate(rate)
+        else:
+            self.user_overrides[user_id] = rate
+            self._user_bucket(user_id).set_rate(rate)
+        LOGGER(__name__).info(f"Bandwidth limit for {user_id or 'each user'} set to {rate / MB:.1f} MB/s")
+
+    def get_limits(self) -> dict:
+        """Current limits in bytes/second (0 = unlimited)"""
+        return {
+            "global": self.global_bucket.rate,
+            "user": self.user_rate,
+            "overrides": dict(self.user_overrides),
+        }
+
+
+# Global bandwidth shaper instance
+bandwidth_shaper = BandwidthShaper(
+    PyroConf.BANDWIDTH_LIMIT_MBPS * MB,
+    PyroConf.USER_BANDWIDTH_LIMIT_MBPS * MB,
+)
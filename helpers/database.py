@@ -2,6 +2,7 @@
 # MongoDB Database Handler for Session Storage
 
 import asyncio
+from time import time
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional, Dict, Any
 from logger import LOGGER
@@ -15,6 +16,8 @@ class Database:
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
         self.sessions_collection = None
+        self.jobs_collection = None
+        self.file_cache_collection = None
         self._connected = False
     
     async def connect(self) -> bool:
@@ -34,6 +37,14 @@ class Database:
             # Create index on user_id for faster lookups
             await self.sessions_collection.create_index("user_id", unique=True)
             
+            self.jobs_collection = self.db["batch_jobs"]
+            await self.jobs_collection.create_index("job_id", unique=True)
+            await self.jobs_collection.create_index([("user_id", 1), ("created_at", -1)])
+            
+            self.file_cache_collection = self.db["file_cache"]
+            await self.file_cache_collection.create_index("file_unique_id", unique=True)
+            await self.file_cache_collection.create_index("last_used")
+            
             self._connected = True
             LOGGER(__name__).info("Successfully connected to MongoDB")
             return True
@@ -178,6 +189,117 @@ class Database:
             LOGGER(__name__).error(f"Failed to delete setting {key}: {e}")
             return False
 
+    
+    # ============ Batch Job Journal Methods ============
+    
+    async def create_batch_job(self, job: Dict[str, Any]) -> bool:
+        """Record a new batch job"""
+        try:
+            now = time()
+            await self.jobs_collection.insert_one(
+                {**job, "status": "running", "created_at": now, "updated_at": now}
+            )
+            LOGGER(__name__).info(f"Batch job {job['job_id']} created for user {job['user_id']}")
+            return True
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to create batch job {job.get('job_id')}: {e}")
+            return False
+    
+    async def checkpoint_batch_job(self, job_id: str, done_ids: list, done_groups: list, counters: Dict[str, int]) -> bool:
+        """Mark post IDs and media groups of a batch job as delivered and store its counters"""
+        try:
+            await self.jobs_collection.update_one(
+                {"job_id": job_id},
+                {
+                    "$addToSet": {
+                        "done_ids": {"$each": done_ids},
+                        "done_groups": {"$each": done_groups}
+                    },
+                    "$set": {"counters": counters, "updated_at": time()}
+                }
+            )
+            return True
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to checkpoint batch job {job_id}: {e}")
+            return False
+    
+    async def set_batch_job_status(self, job_id: str, status: str) -> bool:
+        """Update the status of a batch job (running, completed, incomplete, cancelled)"""
+        try:
+            await self.jobs_collection.update_one(
+                {"job_id": job_id},
+                {"$set": {"status": status, "updated_at": time()}}
+            )
+            return True
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to update batch job {job_id}: {e}")
+            return False
+    
+    async def get_resumable_batch_job(self, user_id: int, job_id: str = None) -> Optional[Dict[str, Any]]:
+        """Get a user's unfinished batch job, the most recent one if job_id is not given"""
+        try:
+            query = {"user_id": user_id, "status": {"$in": ["running", "cancelled", "incomplete"]}}
+            if job_id:
+                query["job_id"] = job_id
+            cursor = self.jobs_collection.find(query).sort("created_at", -1).limit(1)
+            jobs = await cursor.to_list(length=1)
+            return jobs[0] if jobs else None
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to get resumable batch job for user {user_id}: {e}")
+            return None
+
+    
+    # ============ Uploaded File Cache Methods ============
+    
+    async def get_cached_file(self, file_unique_id: str) -> Optional[str]:
+        """Get the bot-side file_id cached for a source file_unique_id"""
+        try:
+            entry = await self.file_cache_collection.find_one_and_update(
+                {"file_unique_id": file_unique_id},
+                {"$set": {"last_used": time()}}
+            )
+            return entry.get("file_id") if entry else None
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to get cached file {file_unique_id}: {e}")
+            return None
+    
+    async def save_cached_file(self, file_unique_id: str, file_id: str) -> bool:
+        """Cache the bot-side file_id for a source file_unique_id"""
+        try:
+            await self.file_cache_collection.update_one(
+                {"file_unique_id": file_unique_id},
+                {"$set": {"file_unique_id": file_unique_id, "file_id": file_id, "last_used": time()}},
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to cache file {file_unique_id}: {e}")
+            return False
+    
+    async def delete_cached_file(self, file_unique_id: str) -> bool:
+        """Remove a cached file_id"""
+        try:
+            result = await self.file_cache_collection.delete_one({"file_unique_id": file_unique_id})
+            return result.deleted_count > 0
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to delete cached file {file_unique_id}: {e}")
+            return False
+    
+    async def trim_file_cache(self, max_entries: int) -> int:
+        """Evict the least recently used cache entries above max_entries"""
+        try:
+            excess = await self.file_cache_collection.count_documents({}) - max_entries
+            if excess <= 0:
+                return 0
+            cursor = self.file_cache_collection.find({}, {"_id": 1}).sort("last_used", 1).limit(excess)
+            ids = [entry["_id"] for entry in await cursor.to_list(length=excess)]
+            result = await self.file_cache_collection.delete_many({"_id": {"$in": ids}})
+            LOGGER(__name__).info(f"Evicted {result.deleted_count} file cache entries")
+            return result.deleted_count
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to trim file cache: {e}")
+            return 0
+
 
 # Global database instance
 db: Optional[Database] = None
@@ -0,0 +1,83 @@
+# Copyright (C) @TheSmartBisnu
+# Cache of uploaded files: source file_unique_id -> bot-side file_id
+
+from collections import OrderedDict
+from typing import Optional
+
+from helpers.database import Database
+from config import PyroConf
+from logger import LOGGER
+
+
+class FileCache:
+    """
+    Two-level cache of files the bot has already uploaded.
+
+    An in-memory LRU sits in front of the MongoDB `file_cache` collection. Both are
+    size-bounded: memory by FILE_CACHE_MEMORY_SIZE entries, MongoDB by
+    FILE_CACHE_MAX_ENTRIES (least recently used entries are evicted).
+    """
+
+    # Trim the MongoDB collection once every this many writes
+    TRIM_INTERVAL = 100
+
+    def __init__(self, db: Optional[Database] = None):
+        self.db = db
+        self.memory: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def _remember(self, file_unique_id: str, file_id: str):
+        self.memory[file_unique_id] = file_id
+        self.memory.move_to_end(file_unique_id)
+        while len(self.memory) > PyroConf.FILE_CACHE_MEMORY_SIZE:
+            self.memory.popitem(last=False)
+
+    async def get(self, file_unique_id: str) -> Optional[str]:
+        """Get the cached bot-side file_id for a source file"""
+        file_id = self.memory.get(file_unique_id)
+        if file_id:
+            self.memory.move_to_end(file_unique_id)
+        elif self.db and self.db.is_connected:
+            file_id = await self.db.get_cached_file(file_unique_id)
+            if file_id:
+                self._remember(file_unique_id, file_id)
+
+        if file_id:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return file_id
+
+    async def put(self, file_unique_id: str, file_id: str):
+        """Cache the bot-side file_id of an upload"""
+        self._remember(file_unique_id, file_id)
+        if self.db and self.db.is_connected:
+            await self.db.save_cached_file(file_unique_id, file_id)
+            self._writes += 1
+            if self._writes % self.TRIM_INTERVAL == 0:
+                await self.db.trim_file_cache(PyroConf.FILE_CACHE_MAX_ENTRIES)
+
+    async def invalidate(self, file_unique_id: str):
+        """Drop an entry whose file_id could not be sent"""
+        LOGGER(__name__).info(f"Invalidating cached file {file_unique_id}")
+        self.memory.pop(file_unique_id, None)
+        if self.db and self.db.is_connected:
+            await self.db.delete_cached_file(file_unique_id)
+
+
+# Global file cache instance
+file_cache: Optional[FileCache] = None
+
+
+def init_file_cache(db: Optional[Database] = None) -> FileCache:
+    """Initialize and return file cache"""
+    global file_cache
+    file_cache = FileCache(db)
+    return file_cache
+
+
+def get_file_cache() -> Optional[FileCache]:
+    """Get current file cache instance"""
+    return file_cache
@@ -5,6 +5,9 @@ import os
 from typing import Optional
 
 from logger import LOGGER
+from helpers.media_info import media_info_cache
+from helpers.thumbnails import job_thumbnail_path
+from helpers.transfer import unstage_download
 
 SIZE_UNITS = ["B", "KB", "MB", "GB", "TB", "PB"]
 
@@ -17,11 +20,15 @@ def get_download_path(folder_id: int, filename: str, root_dir: str = "downloads"
 def cleanup_download(path: str) -> None:
     try:
         LOGGER(__name__).info(f"Cleaning Download: {path}")
+        media_info_cache.evict(path)
+        unstage_download(path)
         
         if os.path.exists(path):
             os.remove(path)
         if os.path.exists(path + ".temp"):
             os.remove(path + ".temp")
+        if os.path.exists(job_thumbnail_path(path)):
+            os.remove(job_thumbnail_path(path))
 
         folder = os.path.dirname(path)
         if os.path.isdir(folder) and not os.listdir(folder):
@@ -0,0 +1,121 @@
+# Copyright (C) @TheSmartBisnu
+# Registry of running download jobs (/jobs, /job, /cancel <id>)
+
+import asyncio
+from time import time
+from uuid import uuid4
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Job of the code currently running; inherited by every task it creates
+current_job: ContextVar[Optional["Job"]] = ContextVar("current_job", default=None)
+
+
+class Transfer:
+    """Byte counters of one download or upload, rolled up into its job"""
+
+    def __init__(self, job: Optional["Job"] = None):
+        self.job = job
+        self.current = 0
+        self.total = 0
+
+    def update(self, current: int, total: int):
+        if self.job:
+            self.job.bytes_done += current - self.current
+            self.job.bytes_total += total - self.total
+        self.current = current
+        self.total = total
+
+
+class Job:
+    """One /dl link or /bdl range with its tasks and progress"""
+
+    def __init__(self, job_id: str, owner: int, kind: str, source: str, start_id=None, end_id=None):
+        self.job_id = job_id
+        self.owner = owner
+        self.kind = kind
+        self.source = source
+        self.start_id = start_id
+        self.end_id = end_id
+        self.stage = "queued"
+        self.started_at = time()
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.posts_done = 0
+        self.posts_total = 0
+        self.cancelled = False
+        self.tasks = set()
+
+    def start_transfer(self, action: str) -> Transfer:
+        """Register a download/upload; `action` becomes the job's current stage"""
+        self.stage = action
+        return Transfer(self)
+
+    def add_task(self, task: asyncio.Task):
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def cancel(self) -> int:
+        """Cancel every running task of the job. Returns the number of tasks cancelled."""
+        self.cancelled = True
+        self.stage = "cancelling"
+        cancelled = 0
+        for task in list(self.tasks):
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    @property
+    def elapsed(self) -> float:
+        return time() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second moved by the job so far"""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds left, from post progress for batches and byte progress otherwise"""
+        if self.posts_total and self.posts_done:
+            return (self.posts_total - self.posts_done) * self.elapsed / self.posts_done
+        if self.bytes_total and self.throughput:
+            return (self.bytes_total - self.bytes_done) / self.throughput
+        return None
+
+
+class JobRegistry:
+    """Running jobs by ID"""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+
+    def create(self, owner: int, kind: str, source: str, start_id=None, end_id=None, job_id: str = None) -> Job:
+        job = Job(job_id or uuid4().hex[:8], owner, kind, source, start_id, end_id)
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def list(self, owner: int = None) -> List[Job]:
+        """All running jobs, or only those of one user"""
+        return [job for job in self.jobs.values() if owner is None or job.owner == owner]
+
+    def finish(self, job: Job):
+        self.jobs.pop(job.job_id, None)
+
+
+# Global job registry instance
+job_registry = JobRegistry()
+
+
+async def run_in_job(job: Job, coro):
+    """Run a coroutine as `job`: tasks and transfers it starts are attributed to the job"""
+    token = current_job.set(job)
+    try:
+        return await coro
+    finally:
+        current_job.reset(token)
+        job_registry.finish(job)
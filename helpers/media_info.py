@@ -0,0 +1,70 @@
+# Copyright (C) @TheSmartBisnu
+# Per-file memo of ffprobe results
+
+import os
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from logger import LOGGER
+
+
+class MediaInfoCache:
+    """
+    Memoizes media info per file so ffprobe runs at most once per download.
+
+    Entries are keyed by path plus inode, mtime and size, so a file replaced at
+    the same path is probed again. Concurrent lookups for the same file share a
+    single probe. Entries are evicted when the download is cleaned up.
+    """
+
+    # Safety bound for files that are never cleaned up
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self.results: "OrderedDict[Tuple, tuple]" = OrderedDict()
+        self.in_flight: Dict[Tuple, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(path: str) -> Tuple:
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    async def get(self, path: str, probe):
+        """Return `await probe(path)`, probing each file version only once"""
+        try:
+            key = self._key(path)
+        except OSError:
+            return await probe(path)
+
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(probe(path))
+            self.in_flight[key] = task
+            try:
+                # Shielded so a cancelled caller does not abort the probe for the others
+                result = await asyncio.shield(task)
+            finally:
+                self.in_flight.pop(key, None)
+            self.results[key] = result
+            while len(self.results) > self.MAX_ENTRIES:
+                self.results.popitem(last=False)
+            return result
+
+        # Another caller is already probing this file
+        return await asyncio.shield(task)
+
+    def evict(self, path: str):
+        """Drop every cached version of a file"""
+        abs_path = os.path.abspath(path)
+        for key in [key for key in self.results if key[0] == abs_path]:
+            del self.results[key]
+        LOGGER(__name__).debug(f"Evicted media info for {path}")
+
+
+# Global media info cache instance
+media_info_cache = MediaInfoCache()
@@ -0,0 +1,99 @@
+# Copyright (C) @TheSmartBisnu
+# Bounded executor for ffmpeg / ffprobe subprocesses
+
+import asyncio
+from time import monotonic
+from asyncio.subprocess import PIPE
+from asyncio import create_subprocess_exec, create_subprocess_shell
+
+from config import PyroConf
+from logger import LOGGER
+
+
+class MediaToolExecutor:
+    """
+    Runs media tool subprocesses with at most MEDIA_TOOL_WORKERS at a time.
+
+    Extra calls wait in a FIFO queue. Every call has a timeout (MEDIA_TOOL_TIMEOUT
+    unless given), after which the process is killed.
+    """
+
+    def __init__(self):
+        self._semaphore = None
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+        self.total_run_time = 0.0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, PyroConf.MEDIA_TOOL_WORKERS))
+        return self._semaphore
+
+    async def run(self, cmd, shell=False, timeout=None):
+        """
+        Run a command once a worker slot is free.
+
+        Returns:
+            (stdout, stderr, returncode)
+
+        Raises:
+            asyncio.TimeoutError: The command ran longer than the timeout and was killed
+        """
+        timeout = timeout or PyroConf.MEDIA_TOOL_TIMEOUT
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.running += 1
+        started = monotonic()
+        try:
+            if shell:
+                proc = await create_subprocess_shell(cmd, stdout=PIPE, stderr=PIPE)
+            else:
+                proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                proc.kill()
+                await proc.wait()
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                    LOGGER(__name__).warning(f"Media tool timed out after {timeout}s: {cmd[0] if not shell else cmd}")
+                raise
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.total_run_time += monotonic() - started
+            self.semaphore.release()
+
+        try:
+            stdout = stdout.decode().strip()
+        except:
+            stdout = "Unable to decode the response!"
+        try:
+            stderr = stderr.decode().strip()
+        except:
+            stderr = "Unable to decode the error!"
+        return stdout, stderr, proc.returncode
+
+    def get_stats(self) -> dict:
+        """Queue depth and run time counters"""
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_run_time": self.total_run_time / self.completed if self.completed else 0.0,
+        }
+
+
+# Global media tool executor instance
+media_tools = MediaToolExecutor()
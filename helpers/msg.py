@@ -1,9 +1,24 @@
 # Copyright (C) @TheSmartBisnu
 # Channel: https://t.me/itsSmartDev
 
+import asyncio
+
+from pyrogram import raw
+from pyrogram.errors import ChannelInvalid, ChannelPrivate, ChatForbidden, FloodWait, PeerIdInvalid
 from pyrogram.parser import Parser
 from pyrogram.utils import get_channel_id
 
+from logger import LOGGER
+
+# Telegram returns at most 200 messages per messages.getMessages call
+MAX_MESSAGES_PER_REQUEST = 200
+
+# Attempts at fetching a whole chunk before it is split into smaller requests
+FETCH_ATTEMPTS = 2
+
+# Errors that affect the whole chat, where smaller requests cannot help
+CHAT_ACCESS_ERRORS = (ChannelPrivate, ChannelInvalid, ChatForbidden, PeerIdInvalid)
+
 
 async def get_parsed_msg(text, entities):
     return Parser.unparse(text, entities or [], is_html=False)
@@ -40,6 +55,15 @@ def getChatMsgID(link: str):
     return chat_id, message_id
 
 
+def get_media(chat_message):
+    """Return the media object (photo, video, document, ...) of a message, or None"""
+    for attr in ("document", "video", "audio", "voice", "video_note", "animation", "sticker", "photo"):
+        media = getattr(chat_message, attr, None)
+        if media:
+            return media
+    return None
+
+
 def get_file_name(message_id: int, chat_message) -> str:
     if chat_message.document:
         return chat_message.document.file_name
@@ -64,3 +88,80 @@ def get_file_name(message_id: int, chat_message) -> str:
         return f"{message_id}.jpg"
     else:
         return f"{message_id}"
+
+
+async def prefetch_messages(client, chat_id, message_ids, chunk_size=MAX_MESSAGES_PER_REQUEST, buffer_chunks=2):
+    """
+    Fetch messages in chunks of up to 200 IDs per get_messages call.
+
+    A background task keeps up to `buffer_chunks` chunks fetched ahead of the consumer,
+    so scanning the next IDs overlaps with downloading the current ones.
+
+    A chunk that fails is retried, then fetched again in halves, so a transient error or
+    one bad ID does not fail every post of the chunk. Only the IDs that still cannot be
+    fetched on their own (or a whole chunk, for chat access errors) are reported.
+
+    Yields:
+        (chunk_ids, messages, error) tuples. If the IDs could not be fetched, messages
+        is empty and error holds the exception.
+    """
+    message_ids = list(message_ids)
+    queue = asyncio.Queue(maxsize=max(1, buffer_chunks))
+
+    async def fetch(ids, attempts):
+        """Fetch `ids`, returning (ids, messages, error) tuples for the parts fetched or failed"""
+        error = None
+        for attempt in range(attempts):
+            if attempt:
+                # FloodWaits too long for the rate controller reach us; wait them out once
+                await asyncio.sleep(error.value if isinstance(error, FloodWait) else 1)
+            try:
+                return [(ids, await client.get_messages(chat_id=chat_id, message_ids=ids) or [], None)]
+            except asyncio.CancelledError:
+                raise
+            except CHAT_ACCESS_ERRORS as e:
+                return [(ids, [], e)]
+            except Exception as e:
+                error = e
+        if len(ids) == 1:
+            return [(ids, [], error)]
+        LOGGER(__name__).warning(f"Fetching posts {ids[0]}–{ids[-1]} failed ({error}), retrying in halves")
+        middle = len(ids) // 2
+        return await fetch(ids[:middle], 1) + await fetch(ids[middle:], 1)
+
+    async def producer():
+        for i in range(0, len(message_ids), chunk_size):
+            for item in await fetch(message_ids[i:i + chunk_size], FETCH_ATTEMPTS):
+                await queue.put(item)
+        await queue.put(None)
+
+    task = asyncio.create_task(producer())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        task.cancel()
+
+
+def get_document_attributes(chat_message, media_type: str, file_name: str) -> list:
+    """Build raw document upload attributes from the source message metadata (no ffprobe)"""
+    attributes = [raw.types.DocumentAttributeFilename(file_name=file_name)]
+    if media_type == "video":
+        video = chat_message.video
+        attributes.append(raw.types.DocumentAttributeVideo(
+            duration=video.duration or 0,
+            w=video.width or 640,
+            h=video.height or 480,
+            supports_streaming=True
+        ))
+    elif media_type == "audio":
+        audio = chat_message.audio
+        attributes.append(raw.types.DocumentAttributeAudio(
+            duration=audio.duration or 0,
+            title=audio.title,
+            performer=audio.performer
+        ))
+    return attributes
@@ -0,0 +1,133 @@
+# Copyright (C) @TheSmartBisnu
+# Coalesced progress message updates shared by all transfers
+
+import asyncio
+from time import time
+from typing import Callable, Dict, Optional, Tuple
+
+from pyrogram.errors import FloodWait, MessageNotModified
+
+from helpers.files import get_readable_file_size
+from config import PyroConf
+from logger import LOGGER
+
+# Progress bar template
+PROGRESS_BAR = """
+Percentage: {percentage:.2f}% | {current}/{total}
+Speed: {speed}/s
+Estimated Time Left: {est_time} seconds
+"""
+
+
+def render_progress(action: str, current: int, total: int, start_time: float) -> str:
+    """Render a progress bar for `current` of `total` bytes"""
+    elapsed = max(time() - start_time, 0.001)
+    speed = current / elapsed
+    percentage = current * 100 / total if total else 0
+    est_time = int((total - current) / speed) if speed and total else 0
+    filled = min(10, int(percentage // 10))
+    return f"**{action}**\n\n{'▓' * filled}{'░' * (10 - filled)}" + PROGRESS_BAR.format(
+        percentage=percentage,
+        current=get_readable_file_size(current),
+        total=get_readable_file_size(total),
+        speed=get_readable_file_size(speed),
+        est_time=est_time,
+    )
+
+
+class ProgressEntry:
+    """Render state of one progress message"""
+
+    def __init__(self, message, render: Optional[Callable[[], str]] = None):
+        self.message = message
+        self.render = render or self._render_transfers
+        self.action = ""
+        self.start_time = time()
+        # {transfer: (current, total)}, several transfers may share one message (albums)
+        self.transfers: Dict[object, Tuple[int, int]] = {}
+        self.last_text = None
+
+    def _render_transfers(self) -> str:
+        current = sum(current for current, _ in self.transfers.values())
+        total = sum(total for _, total in self.transfers.values())
+        return render_progress(self.action, current, total, self.start_time)
+
+
+class ProgressService:
+    """
+    Pushes progress to Telegram on a fixed schedule instead of on every chunk.
+
+    Transfers only record their counters. Every PROGRESS_UPDATE_INTERVAL seconds each
+    tracked message is rendered once and edited only if its text changed, so the
+    number of edits no longer grows with the number of parallel transfers.
+    """
+
+    def __init__(self):
+        self.entries: Dict[Tuple[int, int], ProgressEntry] = {}
+        self.paused_until = 0.0
+        self.edits = 0
+        self._task = None
+
+    @staticmethod
+    def _key(message) -> Tuple[int, int]:
+        return (message.chat.id, message.id)
+
+    def update(self, message, transfer, action: str, current: int, total: int, start_time: float):
+        """Record a transfer's progress on its progress message"""
+        entry = self.entries.get(self._key(message))
+        if entry is None:
+            entry = ProgressEntry(message)
+            entry.start_time = start_time
+            self.entries[self._key(message)] = entry
+        entry.action = action
+        entry.transfers[transfer] = (current, total)
+
+    def watch(self, message, render: Callable[[], str]):
+        """Keep a message updated with the text returned by `render`"""
+        self.entries[self._key(message)] = ProgressEntry(message, render)
+
+    def forget(self, message):
+        """Stop updating a message (call before deleting or editing it yourself)"""
+        if message:
+            self.entries.pop(self._key(message), None)
+
+    async def flush(self):
+        """Edit every message whose rendered text changed since its last edit"""
+        for key, entry in list(self.entries.items()):
+            if time() < self.paused_until:
+                return
+            try:
+                text = entry.render()
+                if text == entry.last_text:
+                    continue
+                entry.last_text = text
+                await entry.message.edit(text)
+                self.edits += 1
+            except MessageNotModified:
+                pass
+            except FloodWait as e:
+                # Progress is cosmetic: back off completely and let transfers use the budget
+                self.paused_until = time() + e.value
+                LOGGER(__name__).warning(f"Progress updates paused for {e.value}s (FloodWait)")
+                return
+            except Exception as e:
+                # Message deleted or no longer editable
+                LOGGER(__name__).debug(f"Dropping progress message {key}: {e}")
+                self.entries.pop(key, None)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(max(1, PyroConf.PROGRESS_UPDATE_INTERVAL))
+            try:
+                await self.flush()
+            except Exception as e:
+                LOGGER(__name__).error(f"Progress update failed: {e}")
+
+    def start(self):
+        """Start the periodic update loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+
+# Global progress service instance
+progress_service = ProgressService()
@@ -0,0 +1,140 @@
+# Copyright (C) @TheSmartBisnu
+# Adaptive FloodWait-driven rate controller for Telegram API calls
+
+import asyncio
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from pyrogram import raw
+from pyrogram.errors import FloodWait
+
+from config import PyroConf
+from logger import LOGGER
+
+# Raw API calls that are throttled, grouped by method class.
+# Covers get_messages, send_*, copy_message / copy_media_group and send_media_group.
+METHOD_CLASSES = {
+    raw.functions.messages.GetMessages: "read",
+    raw.functions.channels.GetMessages: "read",
+    raw.functions.messages.SendMessage: "send",
+    raw.functions.messages.SendMedia: "send",
+    raw.functions.messages.SendMultiMedia: "send",
+    raw.functions.messages.ForwardMessages: "send",
+}
+
+
+class RateState:
+    """AIMD state for one client and method class"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.flood_waits = 0
+        self.lock = asyncio.Lock()
+
+
+class RateController:
+    """
+    Additive-increase / multiplicative-decrease rate controller.
+
+    Every throttled call reserves a slot spaced 1/rate seconds after the previous one.
+    Each success raises the rate by RATE_LIMIT_STEP; a FloodWait halves it and pauses
+    the client/method class for the requested time.
+    """
+
+    def __init__(self):
+        # {(client_key, method_class): RateState}
+        self.states: Dict[Tuple[str, str], RateState] = {}
+
+    def _state(self, key: str, method_class: str) -> RateState:
+        state = self.states.get((key, method_class))
+        if state is None:
+            state = RateState(PyroConf.RATE_LIMIT_INITIAL)
+            self.states[(key, method_class)] = state
+        return state
+
+    async def _acquire(self, state: RateState):
+        async with state.lock:
+            now = monotonic()
+            start = max(now, state.next_slot, state.blocked_until)
+            state.next_slot = start + 1 / state.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def _on_success(self, state: RateState):
+        state.rate = min(PyroConf.RATE_LIMIT_MAX, state.rate + PyroConf.RATE_LIMIT_STEP)
+
+    def _on_flood_wait(self, key: str, method_class: str, state: RateState, seconds: int):
+        state.flood_waits += 1
+        state.rate = max(PyroConf.RATE_LIMIT_MIN, state.rate / 2)
+        state.blocked_until = max(state.blocked_until, monotonic() + seconds)
+        LOGGER(__name__).warning(
+            f"FloodWait {seconds}s on {key}/{method_class}, rate lowered to {state.rate:.2f} req/s"
+        )
+
+    def flood_wait_remaining(self, key: str) -> float:
+        """Seconds until every method class of a client is out of FloodWait"""
+        now = monotonic()
+        remaining = [
+            state.blocked_until - now
+            for (state_key, _), state in self.states.items()
+            if state_key == key
+        ]
+        return max([0.0] + remaining)
+
+    def attach(self, client, key: str):
+        """Route the client's throttled API calls through the controller"""
+        invoke = client.invoke
+
+        async def throttled_invoke(query, *args, **kwargs):
+            method_class = METHOD_CLASSES.get(type(query))
+            if method_class is None:
+                return await invoke(query, *args, **kwargs)
+
+            state = self._state(key, method_class)
+            # Let FloodWait reach us instead of being slept on inside Pyrogram
+            kwargs["sleep_threshold"] = 0
+            while True:
+                await self._acquire(state)
+                try:
+                    result = await invoke(query, *args, **kwargs)
+                except FloodWait as e:
+                    self._on_flood_wait(key, method_class, state, e.value)
+                    # Keep Pyrogram's behaviour of surfacing long waits to the caller
+                    if e.value > client.sleep_threshold:
+                        raise
+                    continue
+                self._on_success(state)
+                return result
+
+        client.invoke = throttled_invoke
+
+    def get_stats(self) -> list:
+        """Return (client_key, method_class, rate, flood_waits) for every tracked state"""
+        return [
+            (key, method_class, state.rate, state.flood_waits)
+            for (key, method_class), state in sorted(self.states.items())
+        ]
+
+
+# Global rate controller instance
+rate_controller: Optional[RateController] = None
+
+
+def init_rate_controller() -> RateController:
+    """Initialize and return rate controller"""
+    global rate_controller
+    rate_controller = RateController()
+    return rate_controller
+
+
+def get_rate_controller() -> Optional[RateController]:
+    """Get current rate controller instance"""
+    return rate_controller
+
+
+def throttle_client(client, key: str):
+    """Attach the rate controller to a client if it is initialized"""
+    if rate_controller:
+        rate_controller.attach(client, key)
@@ -0,0 +1,160 @@
+# Copyright (C) @TheSmartBisnu
+# Per-user, size-aware fair-share scheduler for download slots
+
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from config import PyroConf
+from logger import LOGGER
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+
+class FairScheduler:
+    """
+    Hands out a fixed number of download slots fairly between users.
+
+    Waiting jobs are queued per user in two lanes. Interactive requests (/dl and
+    plain links) are always dispatched before batch posts. Within a lane, users
+    are served round-robin, one job each, so a long /bdl cannot starve anyone else.
+
+    Jobs of at least `large_size` bytes may hold at most `large_slots` slots. The
+    remaining slots stay free for small files, which skip ahead of large files
+    that are waiting for a large slot, so photos keep flowing during big videos.
+    """
+
+    def __init__(self, slots: int, large_size: int = 0, small_slots: int = 0):
+        self.slots = max(1, slots)
+        self.large_size = large_size
+        self.large_slots = max(1, self.slots - small_slots) if large_size > 0 else self.slots
+        self.active = 0
+        self.active_large = 0
+        # {lane: OrderedDict({user_id: deque of (future, large)})}, users in round-robin order
+        self.lanes: Dict[str, "OrderedDict[int, deque]"] = {
+            INTERACTIVE: OrderedDict(),
+            BATCH: OrderedDict(),
+        }
+        self.active_by_user: Dict[int, int] = {}
+
+    def _queued(self, lane: str) -> int:
+        return sum(len(waiters) for waiters in self.lanes[lane].values())
+
+    def _take(self, queues: "OrderedDict[int, deque]", user_id: int):
+        """Remove and return the user's first job that may start now, or None"""
+        waiters = queues[user_id]
+        taken = None
+        for entry in list(waiters):
+            waiter, large = entry
+            if waiter.done():
+                waiters.remove(entry)
+            elif not large or self.active_large < self.large_slots:
+                waiters.remove(entry)
+                taken = entry
+                break
+        if not waiters:
+            del queues[user_id]
+        elif taken:
+            # The user goes to the back of the round-robin order
+            queues.move_to_end(user_id)
+        return taken
+
+    def _dispatch(self):
+        """Give free slots to the next waiters, interactive lane first"""
+        for lane in (INTERACTIVE, BATCH):
+            queues = self.lanes[lane]
+            granted = True
+            while granted and self.active < self.slots and queues:
+                granted = False
+                for user_id in list(queues):
+                    if self.active >= self.slots:
+                        return
+                    taken = self._take(queues, user_id)
+                    if taken:
+                        waiter, large = taken
+                        self.active += 1
+                        self.active_large += large
+                        waiter.set_result(None)
+                        granted = True
+
+    def _release(self, large: bool):
+        self.active -= 1
+        self.active_large -= large
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: int, interactive: bool = False, size: int = 0):
+        """Hold one download slot while the block runs; `size` is the file size if known"""
+        lane = INTERACTIVE if interactive else BATCH
+        large = 0 < self.large_size <= size
+        waiter = asyncio.get_running_loop().create_future()
+        self.lanes[lane].setdefault(user_id, deque()).append((waiter, large))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as we were cancelled, hand it on
+                self._release(large)
+            else:
+                waiter.cancel()
+                self._forget(lane, user_id, waiter)
+            raise
+
+        self.active_by_user[user_id] = self.active_by_user.get(user_id, 0) + 1
+        try:
+            yield
+        finally:
+            self.active_by_user[user_id] -= 1
+            if not self.active_by_user[user_id]:
+                del self.active_by_user[user_id]
+            self._release(large)
+
+    def _forget(self, lane: str, user_id: int, waiter):
+        waiters = self.lanes[lane].get(user_id)
+        if not waiters:
+            return
+        for entry in waiters:
+            if entry[0] is waiter:
+                waiters.remove(entry)
+                break
+        if not waiters:
+            del self.lanes[lane][user_id]
+
+    def get_stats(self) -> dict:
+        """Slot usage and queue lengths"""
+        return {
+            "active": self.active,
+            "slots": self.slots,
+            "active_large": self.active_large,
+            "large_slots": self.large_slots,
+            "interactive_queued": self._queued(INTERACTIVE),
+            "batch_queued": self._queued(BATCH),
+            "users_waiting": len(set(self.lanes[INTERACTIVE]) | set(self.lanes[BATCH])),
+        }
+
+
+# Global scheduler instance
+scheduler: Optional[FairScheduler] = None
+
+
+def init_scheduler() -> FairScheduler:
+    """Initialize and return scheduler"""
+    global scheduler
+    scheduler = FairScheduler(
+        PyroConf.MAX_CONCURRENT_DOWNLOADS,
+        large_size=PyroConf.LARGE_FILE_THRESHOLD_MB * 1024 * 1024,
+        small_slots=PyroConf.SMALL_FILE_SLOTS,
+    )
+    LOGGER(__name__).info(
+        f"Fair-share scheduler started with {scheduler.slots} slot(s), "
+        f"{scheduler.large_slots} for large files"
+    )
+    return scheduler
+
+
+def get_scheduler() -> Optional[FairScheduler]:
+    """Get current scheduler instance"""
+    return scheduler
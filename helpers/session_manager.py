@@ -2,7 +2,9 @@
 # Session Manager for handling user login/logout with Pyrogram
 
 import asyncio
-from typing import Optional, Dict, Callable
+from time import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Callable, List, Tuple
 from pyrogram import Client
 from pyrogram.errors import (
     SessionPasswordNeeded, 
@@ -11,9 +13,16 @@ from pyrogram.errors import (
     PasswordHashInvalid,
     FloodWait,
     PhoneNumberInvalid,
-    ApiIdInvalid
+    ApiIdInvalid,
+    PeerIdInvalid,
+    ChannelInvalid,
+    ChannelPrivate,
+    ChatForbidden,
+    UsernameInvalid,
+    UsernameNotOccupied
 )
 from helpers.database import get_database
+from helpers.ratelimit import throttle_client, get_rate_controller
 from config import PyroConf
 from logger import LOGGER
 
@@ -26,6 +35,21 @@ class LoginState:
     WAITING_PASSWORD = "waiting_password"
 
 
+# Errors meaning a session cannot see a chat
+ACCESS_ERRORS = (
+    PeerIdInvalid,
+    ChannelInvalid,
+    ChannelPrivate,
+    ChatForbidden,
+    UsernameInvalid,
+    UsernameNotOccupied,
+    KeyError,
+)
+
+# Seconds before a session that could not see a chat is tried again
+ACCESS_RETRY_SECONDS = 600
+
+
 class SessionManager:
     """Manages user sessions and login flow"""
     
@@ -38,6 +62,10 @@ class SessionManager:
         self.primary_client: Optional[Client] = None
         # Fallback to env session
         self.env_client: Optional[Client] = None
+        # Download pool bookkeeping: outstanding transfers per session key
+        self.outstanding: Dict[str, int] = {}
+        # Which sessions can see which chats: {chat_key: {session_key: (has_access, checked_at)}}
+        self.chat_access: Dict[str, Dict[str, Tuple[bool, float]]] = {}
     
     async def initialize_env_session(self) -> bool:
         """Initialize client from environment SESSION_STRING if available"""
@@ -50,6 +78,7 @@ class SessionManager:
                     max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_TRANSMISSIONS,
                     sleep_threshold=30,
                 )
+                throttle_client(self.env_client, "env")
                 await self.env_client.start()
                 self.primary_client = self.env_client
                 LOGGER(__name__).info("ENV session initialized successfully")
@@ -82,6 +111,7 @@ class SessionManager:
                         max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_TRANSMISSIONS,
                         sleep_threshold=30,
                     )
+                    throttle_client(client, f"user:{user_id}")
                     await client.start()
                     self.active_clients[user_id] = client
                     
@@ -106,6 +136,117 @@ class SessionManager:
         """Get client for a specific user"""
         return self.active_clients.get(user_id)
     
+    # ============ Download Pool ============
+    
+    def pool_clients(self) -> List[Tuple[str, Client]]:
+        """All sessions that can serve downloads, as (session_key, client)"""
+        clients = [(f"user:{user_id}", client) for user_id, client in self.active_clients.items()]
+        if self.env_client:
+            clients.append(("env", self.env_client))
+        return clients
+    
+    def get_client_key(self, client: Client) -> str:
+        """Session key of a pool client"""
+        for key, pool_client in self.pool_clients():
+            if pool_client is client:
+                return key
+        return f"client:{id(client)}"
+    
+    @staticmethod
+    def _chat_key(chat_id) -> str:
+        return str(chat_id).lower().lstrip("@")
+    
+    def record_access(self, chat_id, client_key: str, has_access: bool):
+        """Remember whether a session can see a chat"""
+        self.chat_access.setdefault(self._chat_key(chat_id), {})[client_key] = (has_access, time())
+    
+    def pick_clients(self, chat_id) -> List[Tuple[str, Client]]:
+        """
+        Order pool sessions for work on a chat.
+
+        Sessions known to lack access are left out; sessions under FloodWait go last.
+        The rest are ordered by fewest outstanding transfers, known access first.
+        """
+        access = self.chat_access.get(self._chat_key(chat_id), {})
+        rate_controller = get_rate_controller()
+        candidates = []
+        for key, client in self.pool_clients():
+            has_access, checked_at = access.get(key, (None, 0))
+            if has_access is False and time() - checked_at < ACCESS_RETRY_SECONDS:
+                continue
+            flooded = bool(rate_controller and rate_controller.flood_wait_remaining(key) > 0)
+            candidates.append(((flooded, self.outstanding.get(key, 0), has_access is not True), key, client))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [(key, client) for _, key, client in candidates]
+    
+    async def find_pool_client(self, chat_id, probe: Callable):
+        """
+        Run `await probe(client)` on pool sessions in pick order until one can see the chat.
+
+        Returns:
+            (client, result) of the first session with access, or (None, None) if the pool is empty.
+            Raises the last access error if no session can see the chat.
+        """
+        last_error = None
+        for key, client in self.pick_clients(chat_id):
+            try:
+                result = await probe(client)
+            except ACCESS_ERRORS as e:
+                self.record_access(chat_id, key, False)
+                last_error = e
+                continue
+            self.record_access(chat_id, key, True)
+            return client, result
+        if last_error:
+            raise last_error
+        return None, None
+    
+    async def find_pool_clients(self, chat_id, probe) -> List[Client]:
+        """Every pool session for which `await probe(client)` succeeds, in pick_clients order"""
+        clients = []
+        for key, client in self.pick_clients(chat_id):
+            try:
+                await probe(client)
+            except ACCESS_ERRORS:
+                self.record_access(chat_id, key, False)
+                continue
+            except Exception as e:
+                LOGGER(__name__).warning(f"Could not probe {key} for chat {chat_id}: {e}")
+                continue
+            self.record_access(chat_id, key, True)
+            clients.append(client)
+        return clients
+    
+    @asynccontextmanager
+    async def lease(self, client: Client):
+        """Count an outstanding transfer against a session while the block runs"""
+        key = self.get_client_key(client)
+        self.outstanding[key] = self.outstanding.get(key, 0) + 1
+        try:
+            yield client
+        finally:
+            self.outstanding[key] -= 1
+    
+    def get_pool_stats(self) -> List[Tuple[str, int, float]]:
+        """Return (session_key, outstanding transfers, FloodWait seconds left) per pool session"""
+        rate_controller = get_rate_controller()
+        return [
+            (
+                key,
+                self.outstanding.get(key, 0),
+                rate_controller.flood_wait_remaining(key) if rate_controller else 0,
+            )
+            for key, _ in self.pool_clients()
+        ]
+    
+    def _least_loaded_client(self) -> Optional[Client]:
+        """Pool session with the fewest outstanding transfers, preferring ones not under FloodWait"""
+        stats = {key: (flood > 0, outstanding) for key, outstanding, flood in self.get_pool_stats()}
+        clients = self.pool_clients()
+        if not clients:
+            return None
+        return min(clients, key=lambda item: stats[item[0]])[1]
+    
     async def start_login(self, user_id: int) -> str:
         """Start login process for a user"""
         # Check if already logged in
@@ -225,6 +366,7 @@ class SessionManager:
                 max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_TRANSMISSIONS,
                 sleep_threshold=30,
             )
+            throttle_client(perm_client, f"user:{user_id}")
             await perm_client.start()
             
             # Disconnect temp client
@@ -300,6 +442,7 @@ class SessionManager:
                 max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_TRANSMISSIONS,
                 sleep_threshold=30,
             )
+            throttle_client(perm_client, f"user:{user_id}")
             await perm_client.start()
             
             # Disconnect temp client
@@ -371,12 +514,11 @@ class SessionManager:
         
         # Update primary client if needed
         if self.primary_client == client:
-            if self.active_clients:
-                self.primary_client = list(self.active_clients.values())[0]
-            elif self.env_client:
-                self.primary_client = self.env_client
-            else:
-                self.primary_client = None
+            self.primary_client = self._least_loaded_client()
+        
+        # Forget the removed session's chat access
+        for access in self.chat_access.values():
+            access.pop(f"user:{user_id}", None)
         
         # Remove from database
         db = get_database()
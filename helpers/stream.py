@@ -0,0 +1,159 @@
+# Copyright (C) @TheSmartBisnu
+# Streaming download-to-upload pipe (no file staged on disk)
+
+import math
+import asyncio
+from time import time
+
+from pyrogram import raw, types, utils
+
+from helpers.msg import get_document_attributes, get_file_name, get_media
+from helpers.utils import fan_out, get_target_chat_id, progressArgs, report_progress
+from config import PyroConf
+from logger import LOGGER
+
+# Telegram upload part size (must divide 512 KB) and the big-file threshold
+PART_SIZE = 512 * 1024
+BIG_FILE_SIZE = 10 * 1024 * 1024
+
+
+async def _upload_stream(bot, chat_message, file_size: int, progress_args: tuple):
+    """
+    Pipe the source file into upload parts through a bounded queue.
+
+    A producer reads `stream_media` chunks from the user client and slices them into
+    PART_SIZE parts; MAX_CONCURRENT_TRANSMISSIONS workers upload them with the bot.
+    At most STREAM_BUFFER_PARTS parts are held in memory at any time.
+
+    Returns:
+        The uploaded raw InputFile / InputFileBig
+    """
+    file_id = bot.rnd_id()
+    total_parts = math.ceil(file_size / PART_SIZE)
+    is_big = file_size > BIG_FILE_SIZE
+    queue = asyncio.Queue(maxsize=max(1, PyroConf.STREAM_BUFFER_PARTS))
+    workers_count = max(1, PyroConf.MAX_CONCURRENT_TRANSMISSIONS)
+    uploaded = 0
+    # Workers finish parts concurrently; progress (and bandwidth throttling) is reported one at a time
+    progress_lock = asyncio.Lock()
+
+    async def producer():
+        buffer = b""
+        part = 0
+        async for chunk in chat_message._client.stream_media(chat_message):
+            buffer += chunk
+            while len(buffer) >= PART_SIZE:
+                await queue.put((part, buffer[:PART_SIZE]))
+                buffer = buffer[PART_SIZE:]
+                part += 1
+        if buffer:
+            await queue.put((part, buffer))
+            part += 1
+        if part != total_parts:
+            raise ValueError(f"Streamed {part} parts, expected {total_parts}")
+        for _ in range(workers_count):
+            await queue.put(None)
+
+    async def worker():
+        nonlocal uploaded
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            part, data = item
+            if is_big:
+                await bot.invoke(raw.functions.upload.SaveBigFilePart(
+                    file_id=file_id,
+                    file_part=part,
+                    file_total_parts=total_parts,
+                    bytes=data
+                ))
+            else:
+                await bot.invoke(raw.functions.upload.SaveFilePart(
+                    file_id=file_id,
+                    file_part=part,
+                    bytes=data
+                ))
+            async with progress_lock:
+                uploaded += len(data)
+                await report_progress(uploaded, file_size, *progress_args)
+
+    tasks = [asyncio.create_task(producer())]
+    tasks += [asyncio.create_task(worker()) for _ in range(workers_count)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    file_name = get_file_name(chat_message.id, chat_message)
+    if is_big:
+        return raw.types.InputFileBig(id=file_id, parts=total_parts, name=file_name)
+    return raw.types.InputFile(id=file_id, parts=total_parts, name=file_name, md5_checksum="")
+
+
+async def stream_media_to_chat(bot, chat_message, target_chat_id, media_type, caption, progress_args):
+    """
+    Stream a video, audio or document from the source message straight into a new upload.
+
+    Latency becomes max(download, upload) instead of their sum, and nothing is written to disk.
+
+    Returns:
+        Message: The sent message, or None if the file was sent but could not be parsed
+    """
+    media = get_media(chat_message)
+    if not media or not media.file_size:
+        raise ValueError("Source file size is unknown, cannot stream")
+    file_name = get_file_name(chat_message.id, chat_message)
+    start_time = time()
+
+    input_file = await _upload_stream(bot, chat_message, media.file_size, progress_args)
+
+    text = await utils.parse_text_entities(bot, caption or "", bot.parse_mode, None)
+    r = await bot.invoke(raw.functions.messages.SendMedia(
+        peer=await bot.resolve_peer(target_chat_id),
+        media=raw.types.InputMediaUploadedDocument(
+            file=input_file,
+            mime_type=getattr(media, "mime_type", None) or "application/octet-stream",
+            attributes=get_document_attributes(chat_message, media_type, file_name)
+        ),
+        random_id=bot.rnd_id(),
+        **text
+    ))
+    LOGGER(__name__).info(
+        f"Streamed {file_name} ({media.file_size} bytes) to {target_chat_id} in {time() - start_time:.1f}s"
+    )
+
+    users = {u.id: u for u in r.users}
+    chats = {c.id: c for c in r.chats}
+    for update in r.updates:
+        if isinstance(update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage)):
+            try:
+                return await types.Message._parse(bot, update.message, users, chats)
+            except Exception as e:
+                # The upload succeeded; only parsing the result failed (e.g. Pyrogram 'topics' bug)
+                LOGGER(__name__).warning(f"Could not parse streamed message: {e}")
+    return None
+
+
+async def send_streamed_media(bot, message, chat_message, media_type, caption, progress_message, start_time, is_batch=False):
+    """
+    Streaming counterpart of send_media: deliver to the user or forward channel, then fan out by copy.
+
+    Raises on failure so the caller can fall back to the download/upload pipeline.
+
+    Returns:
+        Message: The sent message (None if it was sent but could not be parsed)
+    """
+    target_chat_id = get_target_chat_id(message)
+    progress_args = progressArgs("📤 Streaming Progress", progress_message, start_time)
+
+    sent_msg = await stream_media_to_chat(
+        bot, chat_message, target_chat_id, media_type, caption, progress_args
+    )
+
+    if not is_batch and PyroConf.FORWARD_CHANNEL_ID != 0:
+        await message.reply("✅ Media uploaded to channel successfully!")
+    if sent_msg:
+        await fan_out(bot, target_chat_id, [sent_msg.id])
+    return sent_msg
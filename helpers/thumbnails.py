@@ -0,0 +1,83 @@
+# Copyright (C) @TheSmartBisnu
+# Video thumbnail cache keyed by source file_unique_id
+
+import os
+import shutil
+from collections import OrderedDict
+from typing import Optional
+
+from config import PyroConf
+from logger import LOGGER
+
+THUMBS_DIR = os.path.join("Assets", "thumbs")
+
+
+def job_thumbnail_path(video_file: str) -> str:
+    """Per-job thumbnail path next to the download (removed by cleanup_download)"""
+    return f"{video_file}.thumb.jpg"
+
+
+class ThumbnailCache:
+    """
+    Keeps generated video thumbnails by source file_unique_id.
+
+    Thumbnails are moved into THUMBS_DIR atomically, so concurrent jobs never see a
+    half-written file. At most THUMB_CACHE_SIZE thumbnails are kept on disk; the
+    least recently used ones are deleted.
+    """
+
+    def __init__(self):
+        self.entries: "OrderedDict[str, str]" = OrderedDict()
+        # Thumbnails left over from a previous run are not indexed, start clean
+        shutil.rmtree(THUMBS_DIR, ignore_errors=True)
+        os.makedirs(THUMBS_DIR, exist_ok=True)
+
+    def get(self, file_unique_id: Optional[str]) -> Optional[str]:
+        """Get the cached thumbnail of a source file"""
+        path = self.entries.get(file_unique_id) if file_unique_id else None
+        if path and os.path.exists(path):
+            self.entries.move_to_end(file_unique_id)
+            return path
+        if path:
+            del self.entries[file_unique_id]
+        return None
+
+    def put(self, file_unique_id: Optional[str], thumb_path: str) -> str:
+        """
+        Move a job's thumbnail into the cache.
+
+        Returns:
+            str: Path to use for the upload (the job path if it is not cached)
+        """
+        if not file_unique_id or PyroConf.THUMB_CACHE_SIZE <= 0:
+            return thumb_path
+
+        path = os.path.join(THUMBS_DIR, f"{file_unique_id}.jpg")
+        try:
+            os.makedirs(THUMBS_DIR, exist_ok=True)
+            os.replace(thumb_path, path)
+        except OSError as e:
+            LOGGER(__name__).warning(f"Could not cache thumbnail {thumb_path}: {e}")
+            return thumb_path
+
+        self.entries[file_unique_id] = path
+        self.entries.move_to_end(file_unique_id)
+        while len(self.entries) > PyroConf.THUMB_CACHE_SIZE:
+            _, old_path = self.entries.popitem(last=False)
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        return path
+
+
+# Global thumbnail cache instance (created on first use)
+thumbnail_cache: Optional[ThumbnailCache] = None
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Get the thumbnail cache, creating it on first use"""
+    global thumbnail_cache
+    if thumbnail_cache is None:
+        thumbnail_cache = ThumbnailCache()
+    return thumbnail_cache
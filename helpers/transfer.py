@@ -0,0 +1,216 @@
+# Copyright (C) @TheSmartBisnu
+# Global budget for file transfers (concurrent downloads, bytes in flight and disk space)
+
+import os
+import shutil
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+from config import PyroConf
+from logger import LOGGER
+
+
+class TransferBudget:
+    """
+    Admits file downloads against a global budget.
+
+    Every download (single posts and media group items alike) holds one of
+    `max_transfers` slots and reserves its file_size against `max_bytes` until it
+    finishes. Waiters are admitted in FIFO order, so large files are not starved by
+    small ones. A file larger than the whole byte budget runs alone.
+
+    Before a download starts, its full size is also reserved against the free space
+    of the download volume minus `disk_margin`. Downloads that do not fit wait until
+    earlier files are uploaded and cleaned up, instead of failing halfway through.
+    Downloaded files are staged until cleanup_download() removes them. A download only
+    waits if in-flight and staged files of other jobs could free enough space: files of
+    its own `group` (the rest of its album) are only cleaned up after it, so a download
+    that needs them gone fails right away instead of blocking the queue. While the
+    downloads ahead of it wait for disk space only, a later download that fits goes
+    first, so the album items they are waiting on can finish.
+    """
+
+    # Seconds between free space re-checks while a download waits for disk space
+    DISK_RECHECK_INTERVAL = 5
+    # Seconds a download may wait for disk space once it is its turn
+    DISK_WAIT_TIMEOUT = 600
+
+    def __init__(self, max_transfers: int, max_bytes: int, download_dir: str = "downloads", disk_margin: int = 0):
+        self.max_transfers = max(1, max_transfers)
+        self.max_bytes = max(1, max_bytes)
+        self.download_dir = download_dir
+        self.disk_margin = disk_margin
+        self.active = 0
+        self.in_flight_bytes = 0
+        self.disk_reserved = 0
+        # Disk reservations of running downloads by group, and downloaded files awaiting cleanup
+        self.reserved_by_group: Dict[object, int] = {}
+        self.staged: Dict[str, Tuple[int, object]] = {}
+        self.condition = asyncio.Condition()
+        self.waiters = deque()
+        # Waiters whose turn it is but that only lack disk space (later waiters may pass them)
+        self.disk_blocked = set()
+
+    def disk_free(self) -> int:
+        """Free bytes on the download volume, minus the safety margin"""
+        os.makedirs(self.download_dir, exist_ok=True)
+        return shutil.disk_usage(self.download_dir).free - self.disk_margin
+
+    def stage(self, path: str, size: int, group: object = None):
+        """Account for a downloaded file that stays on disk until it is cleaned up"""
+        self.staged[os.path.abspath(path)] = (size, group)
+
+    def unstage(self, path: str):
+        self.staged.pop(os.path.abspath(path), None)
+
+    def _freeable(self, group: object) -> int:
+        """Disk space other jobs may still give back (upper bound), excluding `group`'s own files"""
+        staged = sum(size for size, owner in self.staged.values() if group is None or owner is not group)
+        reserved = sum(size for owner, size in self.reserved_by_group.items() if group is None or owner is not group)
+        return staged + reserved
+
+    def _turn(self, ticket) -> bool:
+        """Whether every waiter ahead of `ticket` is only waiting for disk space"""
+        for waiter in self.waiters:
+            if waiter is ticket:
+                return True
+            if waiter not in self.disk_blocked:
+                return False
+        return False
+
+    def _fits(self, size: int, disk_size: int) -> bool:
+        if self.active >= self.max_transfers or self.in_flight_bytes + size > self.max_bytes:
+            return False
+        # Reserved files may be partly written already, so this errs on the safe side
+        return disk_size == 0 or self.disk_free() - self.disk_reserved >= disk_size
+
+    @asynccontextmanager
+    async def reserve(self, file_size: Optional[int], on_disk: bool = True, group: object = None):
+        """
+        Hold a transfer slot and `file_size` bytes of the budget while the block runs.
+
+        Args:
+            on_disk: Also reserve `file_size` bytes of disk space (False for streams)
+            group: Key shared by downloads whose files are cleaned up together (an album)
+
+        Raises:
+            OSError: The file does not fit on the download volume and waiting cannot make room
+        """
+        size = min(file_size or 0, self.max_bytes)
+        disk_size = (file_size or 0) if on_disk else 0
+        if disk_size:
+            os.makedirs(self.download_dir, exist_ok=True)
+            capacity = shutil.disk_usage(self.download_dir).total - self.disk_margin
+            if disk_size > capacity:
+                raise OSError(f"File of {disk_size} bytes does not fit on the download volume")
+
+        ticket = object()
+        async with self.condition:
+            self.waiters.append(ticket)
+            try:
+                blocked_since = None
+                while not (self._turn(ticket) and self._fits(size, disk_size)):
+                    blocked_on_disk = (
+                        self._turn(ticket)
+                        and self.active < self.max_transfers
+                        and self.in_flight_bytes + size <= self.max_bytes
+                    )
+                    if blocked_on_disk:
+                        if disk_size > self.disk_free() + self._freeable(group):
+                            raise OSError(f"Not enough disk space for a file of {disk_size} bytes")
+                        if blocked_since is None:
+                            LOGGER(__name__).info(f"Download of {disk_size} bytes queued for disk space")
+                            blocked_since = monotonic()
+                            # Waiters behind this one may go ahead now
+                            self.disk_blocked.add(ticket)
+                            self.condition.notify_all()
+                        elif monotonic() - blocked_since > self.DISK_WAIT_TIMEOUT:
+                            raise OSError(f"Timed out waiting for disk space for a file of {disk_size} bytes")
+                    elif blocked_since is not None:
+                        # Blocked on slots or bytes again: keep the FIFO order
+                        blocked_since = None
+                        self.disk_blocked.discard(ticket)
+                    try:
+                        # Disk space is freed by cleanups that do not notify us, so re-check periodically
+                        await asyncio.wait_for(self.condition.wait(), self.DISK_RECHECK_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self.waiters.remove(ticket)
+                self.disk_blocked.discard(ticket)
+                # The next waiter may fit now that the head of the queue has moved
+                self.condition.notify_all()
+            self.active += 1
+            self.in_flight_bytes += size
+            self.disk_reserved += disk_size
+            if disk_size:
+                self.reserved_by_group[group] = self.reserved_by_group.get(group, 0) + disk_size
+
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.active -= 1
+                self.in_flight_bytes -= size
+                self.disk_reserved -= disk_size
+                remaining = self.reserved_by_group.get(group, 0) - disk_size
+                if remaining > 0:
+                    self.reserved_by_group[group] = remaining
+                else:
+                    self.reserved_by_group.pop(group, None)
+                self.condition.notify_all()
+
+    def get_stats(self) -> dict:
+        """Current usage of the budget"""
+        return {
+            "active": self.active,
+            "max_transfers": self.max_transfers,
+            "in_flight_bytes": self.in_flight_bytes,
+            "max_bytes": self.max_bytes,
+            "waiting": len(self.waiters),
+            "disk_reserved": self.disk_reserved,
+            "staged_bytes": sum(size for size, _ in self.staged.values()),
+            "disk_free": max(0, self.disk_free()),
+        }
+
+
+# Global transfer budget instance
+transfer_budget: Optional[TransferBudget] = None
+
+
+def init_transfer_budget() -> TransferBudget:
+    """Initialize and return transfer budget"""
+    global transfer_budget
+    transfer_budget = TransferBudget(
+        PyroConf.MAX_CONCURRENT_DOWNLOADS,
+        PyroConf.TRANSFER_BUDGET_MB * 1024 * 1024,
+        disk_margin=PyroConf.DISK_SAFETY_MARGIN_MB * 1024 * 1024,
+    )
+    LOGGER(__name__).info(
+        f"Transfer budget: {transfer_budget.max_transfers} downloads, {PyroConf.TRANSFER_BUDGET_MB} MB in flight"
+    )
+    return transfer_budget
+
+
+def get_transfer_budget() -> Optional[TransferBudget]:
+    """Get current transfer budget instance"""
+    return transfer_budget
+
+
+def reserve_transfer(file_size: Optional[int], on_disk: bool = True, group: object = None):
+    """Reserve a download against the transfer budget, if it is initialized"""
+    return transfer_budget.reserve(file_size, on_disk, group) if transfer_budget else nullcontext()
+
+
+def stage_download(path: Optional[str], size: Optional[int], group: object = None):
+    """Track a downloaded file until cleanup_download() removes it"""
+    if transfer_budget and path:
+        transfer_budget.stage(path, size or 0, group)
+
+
+def unstage_download(path: str):
+    if transfer_budget:
+        transfer_budget.unstage(path)
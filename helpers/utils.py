@@ -7,10 +7,15 @@ from time import time
 from PIL import Image
 from logger import LOGGER
 from typing import Optional
-from asyncio.subprocess import PIPE
-from asyncio import create_subprocess_exec, create_subprocess_shell, wait_for
 
-from pyleaves import Leaves
+from pyrogram import raw
+from pyrogram.errors import (
+    ChannelInvalid,
+    ChannelPrivate,
+    ChatForbidden,
+    MessageIdInvalid,
+    PeerIdInvalid,
+)
 from pyrogram.parser import Parser
 from pyrogram.utils import get_channel_id
 from pyrogram.types import (
@@ -27,36 +32,42 @@ from helpers.files import (
 )
 
 from helpers.msg import (
+    get_media,
     get_parsed_msg
 )
 
+from helpers.album import preupload_album_item, send_preuploaded_album
+from helpers.transfer import reserve_transfer, stage_download
+from helpers.jobs import Transfer, current_job
+from helpers.progress import progress_service
+from helpers.bandwidth import bandwidth_shaper
+from helpers.file_cache import get_file_cache
+from helpers.media_info import media_info_cache
+from helpers.media_tools import media_tools
+from helpers.thumbnails import get_thumbnail_cache, job_thumbnail_path
+
 from config import PyroConf
 
-# Progress bar template
-PROGRESS_BAR = """
-Percentage: {percentage:.2f}% | {current}/{total}
-Speed: {speed}/s
-Estimated Time Left: {est_time} seconds
-"""
+# Source chats the bot cannot read: {chat_id: time of the failed copy}, so copying is not retried for every post
+COPY_UNAVAILABLE_CHATS = {}
 
-async def cmd_exec(cmd, shell=False):
-    if shell:
-        proc = await create_subprocess_shell(cmd, stdout=PIPE, stderr=PIPE)
-    else:
-        proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-    stdout, stderr = await proc.communicate()
-    try:
-        stdout = stdout.decode().strip()
-    except:
-        stdout = "Unable to decode the response!"
-    try:
-        stderr = stderr.decode().strip()
-    except:
-        stderr = "Unable to decode the error!"
-    return stdout, stderr, proc.returncode
+# Seconds before copying from a chat the bot could not read is tried again
+COPY_RETRY_SECONDS = 600
+
+# Telegram accepts at most 100 message IDs per forward request
+MAX_FORWARD_IDS = 100
+
+async def cmd_exec(cmd, shell=False, timeout=None):
+    """Run a media tool command through the bounded executor"""
+    return await media_tools.run(cmd, shell=shell, timeout=timeout)
 
 
 async def get_media_info(path):
+    """Probe a file once; repeated calls for the same file reuse the result"""
+    return await media_info_cache.get(path, _probe_media_info)
+
+
+async def _probe_media_info(path):
     try:
         result = await cmd_exec([
             "ffprobe", "-hide_banner", "-loglevel", "error",
@@ -93,9 +104,91 @@ async def get_media_info(path):
     return 0, None, None, None, None
 
 
-async def get_video_thumbnail(video_file, duration):
-    os.makedirs("Assets", exist_ok=True)
-    output = os.path.join("Assets", "video_thumb.jpg")
+async def resolve_media_info(path, source_message=None):
+    """
+    Get (duration, artist, title, width, height) for an upload.
+
+    Fields are taken from the source message's video/audio attributes; ffprobe
+    only runs when one of the fields the upload needs is missing there.
+    """
+    media = None
+    if source_message:
+        media = source_message.video or source_message.audio
+
+    if media:
+        duration = media.duration or None
+        artist = getattr(media, "performer", None)
+        title = getattr(media, "title", None)
+        width = getattr(media, "width", None)
+        height = getattr(media, "height", None)
+        if source_message.video:
+            needed = (duration, width, height)
+        else:
+            needed = (duration,)
+        if all(needed):
+            return duration, artist, title, width, height
+
+        probed = await get_media_info(path)
+        return (
+            duration or probed[0],
+            artist or probed[1],
+            title or probed[2],
+            width or probed[3],
+            height or probed[4],
+        )
+
+    return await get_media_info(path)
+
+
+# Telegram rejects upload thumbnails larger than 320px on either side
+THUMB_MAX_SIDE = 320
+
+
+async def download_source_thumbnail(source_message, output):
+    """
+    Download the smallest usable server-side thumbnail of the source video.
+
+    Returns:
+        str: Path of the thumbnail, or None if the source has none
+    """
+    video = source_message.video if source_message else None
+    thumbs = [
+        thumb for thumb in (video.thumbs or [])
+        if thumb.width <= THUMB_MAX_SIDE and thumb.height <= THUMB_MAX_SIDE
+    ] if video else []
+    if not thumbs:
+        return None
+
+    thumb = min(thumbs, key=lambda thumb: thumb.file_size or thumb.width * thumb.height)
+    try:
+        path = await source_message._client.download_media(thumb.file_id, file_name=output)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Source thumbnail download failed: {e}")
+        return None
+    return path if path and os.path.exists(path) else None
+
+
+async def get_video_thumbnail(video_file, duration, source_message=None):
+    """
+    Get a thumbnail for a video upload.
+
+    Thumbnails are cached by the source file_unique_id. New ones are written to a
+    per-job path next to the download, so concurrent uploads never share a file.
+    """
+    video = source_message.video if source_message else None
+    file_unique_id = video.file_unique_id if video else None
+    thumbnail_cache = get_thumbnail_cache()
+
+    cached = thumbnail_cache.get(file_unique_id)
+    if cached:
+        return cached
+
+    output = job_thumbnail_path(video_file)
+
+    # Prefer the thumbnail Telegram already generated over extracting a frame
+    thumb = await download_source_thumbnail(source_message, os.path.abspath(output))
+    if thumb:
+        return thumbnail_cache.put(file_unique_id, thumb)
 
     if duration is None:
         duration = (await get_media_info(video_file))[0]
@@ -103,12 +196,6 @@ async def get_video_thumbnail(video_file, duration):
         duration = 3
     duration //= 2
 
-    if os.path.exists(output):
-        try:
-            os.remove(output)
-        except:
-            pass
-
     cmd = [
         "ffmpeg", "-hide_banner", "-loglevel", "error",
         "-ss", str(duration), "-i", video_file,
@@ -116,32 +203,86 @@ async def get_video_thumbnail(video_file, duration):
         "-y", output,
     ]
     try:
-        _, err, code = await wait_for(cmd_exec(cmd), timeout=60)
+        _, err, code = await cmd_exec(cmd, timeout=60)
         if code != 0 or not os.path.exists(output):
             LOGGER(__name__).warning(f"Thumbnail generation failed: {err}")
             return None
     except Exception as e:
         LOGGER(__name__).warning(f"Thumbnail generation error: {e}")
         return None
-    return output
+    return thumbnail_cache.put(file_unique_id, output)
+
 
+def get_target_chat_id(message):
+    """Chat that receives delivered media: the forward channel if set, otherwise the user chat"""
+    return PyroConf.FORWARD_CHANNEL_ID if PyroConf.FORWARD_CHANNEL_ID != 0 else message.chat.id
 
-# Generate progress bar for downloading/uploading
+
+# Progress of a single download/upload, rendered by the progress service
 def progressArgs(action: str, progress_message, start_time):
-    return (action, progress_message, start_time, PROGRESS_BAR, "▓", "░")
+    # Each call starts one transfer, counted against the running job (if any)
+    job = current_job.get()
+    transfer = job.start_transfer(action) if job else Transfer()
+    return (transfer, action, progress_message, start_time)
+
+
+async def report_progress(current, total, transfer, action, progress_message, start_time):
+    """
+    Progress callback, awaited by Pyrogram after every chunk.
+
+    Records counters (message edits are coalesced by the progress service) and
+    holds the transfer back while it is over its bandwidth limit.
+    """
+    owner = transfer.job.owner if transfer.job else None
+    await bandwidth_shaper.throttle(current - transfer.current, owner)
+    transfer.update(current, total)
+    if progress_message:
+        progress_service.update(progress_message, transfer, action, current, total, start_time)
+
+
+async def charge_bandwidth(media_list):
+    """Draw files uploaded without a progress callback (send_media_group) from the bandwidth limits"""
+    size = sum(
+        os.path.getsize(media.media) for media in media_list
+        if isinstance(media.media, str) and os.path.isfile(media.media)
+    )
+    job = current_job.get()
+    await bandwidth_shaper.throttle(size, job.owner if job else None)
+
+
+async def open_progress(message, text, is_batch=False):
+    """Reply with a progress message (None in batch mode, where the batch shows one aggregate message)"""
+    if is_batch:
+        return None
+    return await message.reply(text)
+
+
+async def finish_progress(progress_message, error=None):
+    """Delete a progress message, or replace it with an error"""
+    if not progress_message:
+        if error:
+            LOGGER(__name__).warning(error)
+        return
+    progress_service.forget(progress_message)
+    if error:
+        await progress_message.edit(error)
+    else:
+        await progress_message.delete()
 
 
 async def send_media(
-    bot, message, media_path, media_type, caption, progress_message, start_time, is_batch=False
+    bot, message, media_path, media_type, caption, progress_message, start_time, is_batch=False,
+    source_message=None
 ):
     """
     Send media to user or channel.
     
     Args:
         is_batch: If True, suppress individual confirmation messages (for batch downloads)
+        source_message: Optional source Message whose video/audio metadata is reused instead of ffprobe
     
     Returns:
-        bool: True if upload succeeded, False otherwise
+        Message: The sent message (falsy if the upload failed)
     """
     file_size = os.path.getsize(media_path)
 
@@ -163,17 +304,17 @@ async def send_media(
                     chat_id=target_chat_id,
                     photo=media_path,
                     caption=caption or "",
-                    progress=Leaves.progress_for_pyrogram,
+                    progress=report_progress,
                     progress_args=progress_args,
                 )
             elif media_type == "video":
-                duration, _, _, width, height = await get_media_info(media_path)
+                duration, _, _, width, height = await resolve_media_info(media_path, source_message)
                 if not duration or duration == 0:
                     duration = 0
                 if not width or not height:
                     width = 640
                     height = 480
-                thumb = await get_video_thumbnail(media_path, duration)
+                thumb = await get_video_thumbnail(media_path, duration, source_message)
                 sent_msg = await bot.send_video(
                     chat_id=target_chat_id,
                     video=media_path,
@@ -183,11 +324,11 @@ async def send_media(
                     thumb=thumb,
                     caption=caption or "",
                     supports_streaming=True,
-                    progress=Leaves.progress_for_pyrogram,
+                    progress=report_progress,
                     progress_args=progress_args,
                 )
             elif media_type == "audio":
-                duration, artist, title, _, _ = await get_media_info(media_path)
+                duration, artist, title, _, _ = await resolve_media_info(media_path, source_message)
                 sent_msg = await bot.send_audio(
                     chat_id=target_chat_id,
                     audio=media_path,
@@ -195,7 +336,7 @@ async def send_media(
                     performer=artist,
                     title=title,
                     caption=caption or "",
-                    progress=Leaves.progress_for_pyrogram,
+                    progress=report_progress,
                     progress_args=progress_args,
                 )
             elif media_type == "document":
@@ -203,7 +344,7 @@ async def send_media(
                     chat_id=target_chat_id,
                     document=media_path,
                     caption=caption or "",
-                    progress=Leaves.progress_for_pyrogram,
+                    progress=report_progress,
                     progress_args=progress_args,
                 )
             
@@ -212,11 +353,11 @@ async def send_media(
             if not is_batch:
                 await message.reply(f"✅ Media uploaded to channel successfully!")
             
-            # Use instant copy for bin channel if we have the sent message
-            if sent_msg and PyroConf.BIN_CHANNEL_ID != 0:
-                await copy_messages_to_bin(bot, target_chat_id, [sent_msg.id])
+            # Deliver to the other destinations by copy instead of uploading again
+            if sent_msg:
+                await fan_out(bot, target_chat_id, [sent_msg.id])
             
-            return True
+            return sent_msg
         except Exception as e:
             LOGGER(__name__).error(f"Failed to upload to channel {target_chat_id}: {e}")
             if not is_batch:
@@ -231,11 +372,11 @@ async def send_media(
             sent_msg = await message.reply_photo(
                 media_path,
                 caption=caption or "",
-                progress=Leaves.progress_for_pyrogram,
+                progress=report_progress,
                 progress_args=progress_args,
             )
         elif media_type == "video":
-            duration, _, _, width, height = await get_media_info(media_path)
+            duration, _, _, width, height = await resolve_media_info(media_path, source_message)
 
             if not duration or duration == 0:
                 duration = 0
@@ -245,7 +386,7 @@ async def send_media(
                 width = 640
                 height = 480
 
-            thumb = await get_video_thumbnail(media_path, duration)
+            thumb = await get_video_thumbnail(media_path, duration, source_message)
 
             sent_msg = await message.reply_video(
                 media_path,
@@ -255,206 +396,142 @@ async def send_media(
                 thumb=thumb,
                 caption=caption or "",
                 supports_streaming=True,
-                progress=Leaves.progress_for_pyrogram,
+                progress=report_progress,
                 progress_args=progress_args,
             )
         elif media_type == "audio":
-            duration, artist, title, _, _ = await get_media_info(media_path)
+            duration, artist, title, _, _ = await resolve_media_info(media_path, source_message)
             sent_msg = await message.reply_audio(
                 media_path,
                 duration=duration,
                 performer=artist,
                 title=title,
                 caption=caption or "",
-                progress=Leaves.progress_for_pyrogram,
+                progress=report_progress,
                 progress_args=progress_args,
             )
         elif media_type == "document":
             sent_msg = await message.reply_document(
                 media_path,
                 caption=caption or "",
-                progress=Leaves.progress_for_pyrogram,
+                progress=report_progress,
                 progress_args=progress_args,
             )
         
-        # Use instant copy for bin channel if we have the sent message
-        if sent_msg and PyroConf.BIN_CHANNEL_ID != 0:
-            await copy_messages_to_bin(bot, message.chat.id, [sent_msg.id])
+        # Deliver to the other destinations by copy instead of uploading again
+        if sent_msg:
+            await fan_out(bot, message.chat.id, [sent_msg.id])
+        
+        return sent_msg
 
 
-async def forward_to_channel(bot, media_path, media_type, caption):
-    """Forward media to the configured channel if FORWARD_CHANNEL_ID is set"""
-    if PyroConf.FORWARD_CHANNEL_ID == 0:
-        return  # Channel forwarding disabled
-    
-    try:
-        channel_id = PyroConf.FORWARD_CHANNEL_ID
-        LOGGER(__name__).info(f"Forwarding {media_type} to channel {channel_id}")
-        
-        if media_type == "photo":
-            await bot.send_photo(
-                chat_id=channel_id,
-                photo=media_path,
-                caption=caption or "",
-            )
-        elif media_type == "video":
-            duration, _, _, width, height = await get_media_info(media_path)
-            thumb = await get_video_thumbnail(media_path, duration)
-            await bot.send_video(
-                chat_id=channel_id,
-                video=media_path,
-                duration=duration or 0,
-                width=width or 640,
-                height=height or 480,
-                thumb=thumb,
-                caption=caption or "",
-                supports_streaming=True,
-            )
-        elif media_type == "audio":
-            duration, artist, title, _, _ = await get_media_info(media_path)
-            await bot.send_audio(
-                chat_id=channel_id,
-                audio=media_path,
-                duration=duration,
-                performer=artist,
-                title=title,
-                caption=caption or "",
-            )
-        elif media_type == "document":
-            await bot.send_document(
-                chat_id=channel_id,
-                document=media_path,
-                caption=caption or "",
-            )
-        
-        LOGGER(__name__).info(f"Successfully forwarded {media_type} to channel {channel_id}")
-    except Exception as e:
-        LOGGER(__name__).error(f"Failed to forward to channel: {e}")
+async def send_cached_file(bot, message, file_unique_id, caption, is_batch=False):
+    """
+    Re-send a previously uploaded file by its cached file_id (no download/upload).
 
+    A cached file_id that can no longer be sent is invalidated.
 
-async def forward_media_group_to_channel(bot, valid_media):
-    """Forward a media group to the configured channel if FORWARD_CHANNEL_ID is set"""
-    if PyroConf.FORWARD_CHANNEL_ID == 0:
-        return  # Channel forwarding disabled
-    
+    Returns:
+        bool: True if the file was sent from cache, False otherwise
+    """
+    cache = get_file_cache()
+    if not cache or not file_unique_id:
+        return False
+
+    file_id = await cache.get(file_unique_id)
+    if not file_id:
+        return False
+
+    target_chat_id = get_target_chat_id(message)
     try:
-        channel_id = PyroConf.FORWARD_CHANNEL_ID
-        LOGGER(__name__).info(f"Forwarding media group ({len(valid_media)} items) to channel {channel_id}")
-        
-        await bot.send_media_group(chat_id=channel_id, media=valid_media)
-        
-        LOGGER(__name__).info(f"Successfully forwarded media group to channel {channel_id}")
+        sent_msg = await bot.send_cached_media(
+            chat_id=target_chat_id,
+            file_id=file_id,
+            caption=caption or "",
+        )
     except Exception as e:
         error_msg = str(e)
-        # Check if this is the Pyrogram 'topics' bug - upload actually succeeded
+        # Check if this is the Pyrogram 'topics' bug - send actually succeeded
         if "topics" in error_msg.lower() or "missing 1 required keyword-only argument" in error_msg:
-            LOGGER(__name__).info(f"Forwarded media group to channel {channel_id} (Pyrogram topics bug)")
+            sent_msg = None
         else:
-            LOGGER(__name__).error(f"Failed to forward media group to channel: {e}")
-            # Try individual uploads as fallback only for real errors
-            try:
-                for media in valid_media:
-                    if isinstance(media, InputMediaPhoto):
-                        await bot.send_photo(
-                            chat_id=channel_id,
-                            photo=media.media,
-                            caption=media.caption,
-                        )
-                    elif isinstance(media, InputMediaVideo):
-                        await bot.send_video(
-                            chat_id=channel_id,
-                            video=media.media,
-                            caption=media.caption,
-                        )
-                    elif isinstance(media, InputMediaDocument):
-                        await bot.send_document(
-                            chat_id=channel_id,
-                            document=media.media,
-                            caption=media.caption,
-                        )
-                    elif isinstance(media, InputMediaAudio):
-                        await bot.send_audio(
-                            chat_id=channel_id,
-                            audio=media.media,
-                            caption=media.caption,
-                        )
-            except Exception as fallback_e:
-                LOGGER(__name__).error(f"Failed individual channel upload fallback: {fallback_e}")
+            LOGGER(__name__).warning(f"Cached file {file_unique_id} could not be sent: {e}")
+            await cache.invalidate(file_unique_id)
+            return False
+
+    LOGGER(__name__).info(f"Sent cached file {file_unique_id} to {target_chat_id}")
+    if not is_batch and PyroConf.FORWARD_CHANNEL_ID != 0:
+        await message.reply("✅ Media uploaded to channel successfully!")
 
+    if sent_msg:
+        await fan_out(bot, target_chat_id, [sent_msg.id])
+    return True
 
-async def forward_to_bin_channel(bot, media_path, media_type, caption):
-    """Forward media to the bin channel (backup) if BIN_CHANNEL_ID is set.
-    This happens regardless of FORWARD_CHANNEL_ID setting.
+
+async def cache_sent_file(file_unique_id, sent_msg):
+    """Remember the bot-side file_id of an upload for later re-sends"""
+    cache = get_file_cache()
+    media = get_media(sent_msg) if sent_msg else None
+    if cache and file_unique_id and media:
+        await cache.put(file_unique_id, media.file_id)
+
+
+def get_fanout_chat_ids(from_chat_id: int) -> list:
+    """Destinations that receive a server-side copy of what was delivered to `from_chat_id`"""
+    destinations = [PyroConf.FORWARD_CHANNEL_ID, PyroConf.BIN_CHANNEL_ID]
+    return [chat_id for chat_id in destinations if chat_id != 0 and chat_id != from_chat_id]
+
+
+async def fan_out(bot, from_chat_id: int, message_ids: list):
     """
-    if PyroConf.BIN_CHANNEL_ID == 0:
-        return  # Bin channel disabled
-    
-    try:
-        channel_id = PyroConf.BIN_CHANNEL_ID
-        LOGGER(__name__).info(f"Forwarding {media_type} to bin channel {channel_id}")
-        
-        if media_type == "photo":
-            await bot.send_photo(
-                chat_id=channel_id,
-                photo=media_path,
-                caption=caption or "",
-            )
-        elif media_type == "video":
-            duration, _, _, width, height = await get_media_info(media_path)
-            thumb = await get_video_thumbnail(media_path, duration)
-            await bot.send_video(
-                chat_id=channel_id,
-                video=media_path,
-                duration=duration or 0,
-                width=width or 640,
-                height=height or 480,
-                thumb=thumb,
-                caption=caption or "",
-                supports_streaming=True,
-            )
-        elif media_type == "audio":
-            duration, artist, title, _, _ = await get_media_info(media_path)
-            await bot.send_audio(
-                chat_id=channel_id,
-                audio=media_path,
-                duration=duration,
-                performer=artist,
-                title=title,
-                caption=caption or "",
-            )
-        elif media_type == "document":
-            await bot.send_document(
-                chat_id=channel_id,
-                document=media_path,
-                caption=caption or "",
-            )
-        
-        LOGGER(__name__).info(f"Successfully forwarded {media_type} to bin channel {channel_id}")
-    except Exception as e:
-        LOGGER(__name__).error(f"Failed to forward to bin channel: {e}")
+    Deliver messages that were uploaded once to every other destination.
+
+    Files are only uploaded to the first destination; the forward / bin channels
+    receive server-side copies, so no bytes are sent again.
+    """
+    if not from_chat_id or not message_ids:
+        return
+    for chat_id in get_fanout_chat_ids(from_chat_id):
+        await copy_messages(bot, from_chat_id, chat_id, message_ids)
 
 
-async def copy_messages_to_bin(bot, from_chat_id: int, message_ids: list):
-    """Copy already-sent messages to bin channel (instant, no re-upload).
-    Uses copy_message to avoid "Forwarded from" tag.
+async def copy_messages(bot, from_chat_id: int, to_chat_id: int, message_ids: list):
+    """Copy already-sent messages to another chat (instant, no re-upload).
+    Forwards the whole ID list in bulk with drop_author, so there is no "Forwarded from"
+    tag and albums stay grouped. Falls back to one copy_message per message.
     
     Args:
         bot: The bot client
         from_chat_id: The chat where messages were originally sent
+        to_chat_id: The destination chat
         message_ids: List of message IDs to copy
     """
-    if PyroConf.BIN_CHANNEL_ID == 0:
-        return  # Bin channel disabled
-    
+    LOGGER(__name__).info(f"Copying {len(message_ids)} messages from {from_chat_id} to {to_chat_id}")
+    try:
+        from_peer = await bot.resolve_peer(from_chat_id)
+        to_peer = await bot.resolve_peer(to_chat_id)
+        while message_ids:
+            chunk = message_ids[:MAX_FORWARD_IDS]
+            await bot.invoke(raw.functions.messages.ForwardMessages(
+                from_peer=from_peer,
+                id=chunk,
+                random_id=[bot.rnd_id() for _ in chunk],
+                to_peer=to_peer,
+                drop_author=True,
+            ))
+            message_ids = message_ids[MAX_FORWARD_IDS:]
+        LOGGER(__name__).info(f"Successfully copied messages to {to_chat_id}")
+        return
+    except Exception as e:
+        # Only the chunks that were not forwarded are retried
+        LOGGER(__name__).warning(f"Bulk copy to {to_chat_id} failed, copying one by one: {e}")
+
     try:
-        bin_channel_id = PyroConf.BIN_CHANNEL_ID
-        LOGGER(__name__).info(f"Copying {len(message_ids)} messages from {from_chat_id} to bin channel {bin_channel_id}")
-        
         # Use copy_message for each message (no "Forwarded from" tag)
         for msg_id in message_ids:
             try:
                 await bot.copy_message(
-                    chat_id=bin_channel_id,
+                    chat_id=to_chat_id,
                     from_chat_id=from_chat_id,
                     message_id=msg_id
                 )
@@ -463,13 +540,13 @@ async def copy_messages_to_bin(bot, from_chat_id: int, message_ids: list):
                 if "topics" not in str(copy_e).lower():
                     LOGGER(__name__).warning(f"Failed to copy message {msg_id}: {copy_e}")
         
-        LOGGER(__name__).info(f"Successfully copied messages to bin channel {bin_channel_id}")
+        LOGGER(__name__).info(f"Successfully copied messages to {to_chat_id}")
     except Exception as e:
         error_msg = str(e)
         if "topics" in error_msg.lower() or "missing 1 required keyword-only argument" in error_msg:
-            LOGGER(__name__).info(f"Copied messages to bin channel {bin_channel_id} (Pyrogram topics bug)")
+            LOGGER(__name__).info(f"Copied messages to {to_chat_id} (Pyrogram topics bug)")
         else:
-            LOGGER(__name__).error(f"Failed to copy messages to bin channel: {e}")
+            LOGGER(__name__).error(f"Failed to copy messages to {to_chat_id}: {e}")
 
 
 async def forward_media_group_to_bin(bot, valid_media, from_chat_id: int = None, message_ids: list = None, user_client=None, media_count: int = None):
@@ -478,14 +555,15 @@ async def forward_media_group_to_bin(bot, valid_media, from_chat_id: int = None,
     If from_chat_id and message_ids are provided, uses instant message copying.
     If user_client is provided and message_ids are not available, tries to get
     recent messages from from_chat_id using user_client (which can use get_chat_history).
-    Otherwise falls back to re-uploading the media.
+    Re-uploading is only the last resort, when the sent message IDs are unknown
+    (Pyrogram 'topics' bug) and cannot be recovered.
     """
     if PyroConf.BIN_CHANNEL_ID == 0:
         return  # Bin channel disabled
     
     # If we have message IDs from the original upload, use instant copy
     if from_chat_id and message_ids:
-        await copy_messages_to_bin(bot, from_chat_id, message_ids)
+        await fan_out(bot, from_chat_id, message_ids)
         return
     
     # If no message IDs but we have user_client, try to get them via history
@@ -497,7 +575,7 @@ async def forward_media_group_to_bin(bot, valid_media, from_chat_id: int = None,
             if retrieved_ids:
                 retrieved_ids.reverse()  # Oldest first
                 LOGGER(__name__).info(f"Retrieved {len(retrieved_ids)} message IDs via user client for bin forwarding")
-                await copy_messages_to_bin(bot, from_chat_id, retrieved_ids)
+                await fan_out(bot, from_chat_id, retrieved_ids)
                 return
         except Exception as e:
             LOGGER(__name__).warning(f"Could not get message history via user client: {e}")
@@ -507,6 +585,7 @@ async def forward_media_group_to_bin(bot, valid_media, from_chat_id: int = None,
         channel_id = PyroConf.BIN_CHANNEL_ID
         LOGGER(__name__).info(f"Uploading media group ({len(valid_media)} items) to bin channel {channel_id}")
         
+        await charge_bandwidth(valid_media)
         await bot.send_media_group(chat_id=channel_id, media=valid_media)
         
         LOGGER(__name__).info(f"Successfully uploaded media group to bin channel {channel_id}")
@@ -518,27 +597,107 @@ async def forward_media_group_to_bin(bot, valid_media, from_chat_id: int = None,
         else:
             LOGGER(__name__).error(f"Failed to upload media group to bin channel: {e}")
 
-async def download_single_media(msg, progress_message, start_time):
+async def copy_to_target(bot, chat_message, message, is_batch=False):
+    """
+    Deliver a post (single message or whole media group) by server-side copy.
+
+    Skipped when the source has content protection or the bot cannot read the source chat;
+    the caller then falls back to download/upload.
+
+    Returns:
+        bool: True if the post was copied, False otherwise
+    """
+    if chat_message.has_protected_content or getattr(chat_message.chat, "has_protected_content", False):
+        return False
+
+    source_chat_id = chat_message.chat.id
+    if time() - COPY_UNAVAILABLE_CHATS.get(source_chat_id, 0) < COPY_RETRY_SECONDS:
+        return False
+
+    target_chat_id = get_target_chat_id(message)
+
     try:
-        media_path = await msg.download(
-            progress=Leaves.progress_for_pyrogram,
-            progress_args=progressArgs(
-                "📥 Downloading Progress", progress_message, start_time
-            ),
-        )
+        if chat_message.media_group_id:
+            copied = await bot.copy_media_group(
+                chat_id=target_chat_id,
+                from_chat_id=source_chat_id,
+                message_id=chat_message.id
+            )
+        else:
+            copied = [await bot.copy_message(
+                chat_id=target_chat_id,
+                from_chat_id=source_chat_id,
+                message_id=chat_message.id
+            )]
+    except (ChannelPrivate, ChannelInvalid, ChatForbidden, PeerIdInvalid, KeyError) as e:
+        # The bot has no access to the source chat (KeyError: peer unknown to the bot)
+        COPY_UNAVAILABLE_CHATS[source_chat_id] = time()
+        LOGGER(__name__).info(f"Bot cannot copy from {source_chat_id} ({e}), using download/upload")
+        return False
+    except (MessageIdInvalid, ValueError) as e:
+        # Only this post cannot be copied (deleted, empty, service or unsupported media)
+        LOGGER(__name__).info(f"Cannot copy message {chat_message.id} from {source_chat_id} ({e}), using download/upload")
+        return False
+    except Exception as e:
+        error_msg = str(e)
+        # Check if this is the Pyrogram 'topics' bug - copy actually succeeded
+        if "topics" in error_msg.lower() or "missing 1 required keyword-only argument" in error_msg:
+            LOGGER(__name__).info("Detected Pyrogram 'topics' bug - copy likely succeeded")
+            copied = []
+        else:
+            LOGGER(__name__).warning(f"Copy from {source_chat_id} failed, using download/upload: {e}")
+            return False
+
+    LOGGER(__name__).info(f"Copied message {chat_message.id} from {source_chat_id} to {target_chat_id}")
+    if not is_batch and PyroConf.FORWARD_CHANNEL_ID != 0:
+        await message.reply("✅ Media copied to channel successfully!")
+
+    await fan_out(bot, target_chat_id, [msg.id for msg in copied if msg])
+    return True
+
+
+async def download_single_media(msg, progress_message, start_time, group=None):
+    """
+    Download one media group item, or reuse the cached file_id of an earlier upload.
+    `group` identifies the album, whose files are cleaned up together.
+
+    Returns:
+        (status, media_path, media_obj): status is "success", "cached", "error" or "skip".
+        Cached items have no media_path and carry the file_id as media.
+    """
+    try:
+        status = "success"
+        media_path = None
+        cache = get_file_cache()
+        media = get_media(msg)
+        source = await cache.get(media.file_unique_id) if cache and media else None
+
+        if source:
+            status = "cached"
+        else:
+            async with reserve_transfer(media.file_size if media else None, group=group):
+                media_path = await msg.download(
+                    progress=report_progress,
+                    progress_args=progressArgs(
+                        "📥 Downloading Progress", progress_message, start_time
+                    ),
+                )
+            # The file stays on disk until the whole album has been sent
+            stage_download(media_path, media.file_size, group)
+            source = media_path
 
         parsed_caption = await get_parsed_msg(
             msg.caption or "", msg.caption_entities
         )
 
         if msg.photo:
-            return ("success", media_path, InputMediaPhoto(media=media_path, caption=parsed_caption))
+            return (status, media_path, InputMediaPhoto(media=source, caption=parsed_caption))
         elif msg.video:
-            return ("success", media_path, InputMediaVideo(media=media_path, caption=parsed_caption))
+            return (status, media_path, InputMediaVideo(media=source, caption=parsed_caption))
         elif msg.document:
-            return ("success", media_path, InputMediaDocument(media=media_path, caption=parsed_caption))
+            return (status, media_path, InputMediaDocument(media=source, caption=parsed_caption))
         elif msg.audio:
-            return ("success", media_path, InputMediaAudio(media=media_path, caption=parsed_caption))
+            return (status, media_path, InputMediaAudio(media=source, caption=parsed_caption))
 
     except Exception as e:
         LOGGER(__name__).info(f"Error downloading media: {e}")
@@ -556,27 +715,70 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
         user_client: Optional user client for retrieving message history (for bin channel forwarding)
     
     Returns:
-        bool: True if upload succeeded, False otherwise
+        bool: True if every item was delivered, False otherwise
     """
+    # Fast path: server-side copy of the whole album, no transfer needed
+    if await copy_to_target(bot, chat_message, message, is_batch=is_batch):
+        return True
+
     media_group_messages = await chat_message.get_media_group()
     valid_media = []
     temp_paths = []
     invalid_paths = []
 
     start_time = time()
-    progress_message = await message.reply("📥 Downloading media group...")
+    progress_message = await open_progress(message, "📥 Downloading media group...", is_batch)
     LOGGER(__name__).info(
         f"Downloading media group with {len(media_group_messages)} items..."
     )
 
-    download_tasks = []
-    for msg in media_group_messages:
-        if msg.photo or msg.video or msg.document or msg.audio:
-            download_tasks.append(download_single_media(msg, progress_message, start_time))
+    source_messages = [
+        msg for msg in media_group_messages
+        if msg.photo or msg.video or msg.document or msg.audio
+    ]
+
+    # Raw media of items pre-uploaded while the rest of the album is still downloading
+    preuploaded = {}
+    upload_peer = None
+    if PyroConf.ALBUM_PIPELINE:
+        try:
+            upload_peer = await bot.resolve_peer(get_target_chat_id(message))
+        except Exception as e:
+            LOGGER(__name__).warning(f"Album pipeline disabled for this group: {e}")
+
+    # Items of this album downloading at once (each also draws from the global transfer budget)
+    album_slots = asyncio.Semaphore(max(1, PyroConf.ALBUM_CONCURRENCY))
+    # Disk accounting key of this album: its files are only cleaned up after the album is sent
+    album_group = object()
+
+    def upload_args():
+        return progressArgs("📥 Uploading Progress", progress_message, start_time)
+
+    async def fetch_item(msg):
+        """Download one item and, in pipeline mode, upload it right away"""
+        async with album_slots:
+            result = await download_single_media(msg, progress_message, start_time, album_group)
+        status, _, media_obj = result
+        if upload_peer and status in ("success", "cached") and media_obj:
+            try:
+                preuploaded[id(media_obj)] = await preupload_album_item(
+                    bot, upload_peer, msg, media_obj.media, cached=status == "cached",
+                    progress=report_progress, progress_args=upload_args(),
+                )
+            except Exception as e:
+                LOGGER(__name__).warning(f"Pre-upload of album item {msg.id} failed: {e}")
+        return result
+
+    download_tasks = [fetch_item(msg) for msg in source_messages]
 
     results = await asyncio.gather(*download_tasks, return_exceptions=True)
 
-    for result in results:
+    # Source file_unique_id and message of every media object, and which ones were sent from cache
+    source_unique_ids = {}
+    source_by_media = {}
+    cached_media_ids = set()
+
+    for source_msg, result in zip(source_messages, results):
         if isinstance(result, Exception):
             LOGGER(__name__).error(f"Download task failed: {result}")
             continue
@@ -585,9 +787,70 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
         if status == "success" and media_path and media_obj:
             temp_paths.append(media_path)
             valid_media.append(media_obj)
+        elif status == "cached" and media_obj:
+            valid_media.append(media_obj)
+            cached_media_ids.add(id(media_obj))
         elif status == "error" and media_path:
             invalid_paths.append(media_path)
 
+        if media_obj:
+            source_unique_ids[id(media_obj)] = get_media(source_msg).file_unique_id
+            source_by_media[id(media_obj)] = source_msg
+
+    async def remember_uploads(sent_messages):
+        """Cache the file_ids of freshly uploaded items"""
+        for media, sent_msg in zip(valid_media, sent_messages):
+            if id(media) not in cached_media_ids:
+                await cache_sent_file(source_unique_ids.get(id(media)), sent_msg)
+
+    async def refresh_cached() -> int:
+        """
+        Invalidate cached file_ids after a failed album send and download those items again,
+        so the individual uploads do not reuse them. Returns the number of items dropped.
+        """
+        cache = get_file_cache()
+        refreshed = []
+        dropped = 0
+        for media in valid_media:
+            if id(media) not in cached_media_ids:
+                refreshed.append(media)
+                continue
+            if cache:
+                await cache.invalidate(source_unique_ids[id(media)])
+            status, media_path, fresh = await download_single_media(
+                source_by_media[id(media)], progress_message, start_time, album_group
+            )
+            if status == "success" and fresh:
+                temp_paths.append(media_path)
+                refreshed.append(fresh)
+            else:
+                dropped += 1
+                LOGGER(__name__).error(f"Could not download album item {source_by_media[id(media)].id} again")
+        valid_media[:] = refreshed
+        return dropped
+
+    async def send_album(chat_id):
+        """Send the album from pre-uploaded items, uploading only the ones whose pre-upload failed"""
+        if preuploaded:
+            missing = [media for media in valid_media if id(media) not in preuploaded]
+            try:
+                peer = await bot.resolve_peer(chat_id)
+                for media in missing:
+                    preuploaded[id(media)] = await preupload_album_item(
+                        bot, peer, source_by_media[id(media)], media.media,
+                        cached=id(media) in cached_media_ids,
+                        progress=report_progress, progress_args=upload_args(),
+                    )
+            except Exception as e:
+                LOGGER(__name__).warning(f"Pre-upload retry failed, sending the album from files: {e}")
+            else:
+                return await send_preuploaded_album(
+                    bot, chat_id, [(preuploaded[id(media)], media.caption) for media in valid_media]
+                )
+        # send_media_group takes no progress callback, so charge the bandwidth limits up front
+        await charge_bandwidth(valid_media)
+        return await bot.send_media_group(chat_id=chat_id, media=valid_media)
+
     LOGGER(__name__).info(f"Valid media count: {len(valid_media)}")
 
     if valid_media:
@@ -595,7 +858,9 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
         validated_media = []
         for media in valid_media:
             media_path = media.media
-            if isinstance(media_path, str) and os.path.exists(media_path):
+            if id(media) in cached_media_ids:
+                validated_media.append(media)
+            elif isinstance(media_path, str) and os.path.exists(media_path):
                 file_size = os.path.getsize(media_path)
                 if file_size > 0:
                     validated_media.append(media)
@@ -606,7 +871,7 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                 LOGGER(__name__).warning(f"Skipping missing file: {media_path}")
         
         if not validated_media:
-            await progress_message.delete()
+            await finish_progress(progress_message)
             await message.reply("❌ All media files in the group are invalid or missing.")
             for path in temp_paths + invalid_paths:
                 cleanup_download(path)
@@ -618,6 +883,8 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
         # Track message IDs for bin channel forwarding
         sent_message_ids = []
         upload_chat_id = None
+        # False if any item failed to download or upload (the post is then retried by /resume)
+        delivered = len(validated_media) == len(source_messages)
         
         # Determine target: if FORWARD_CHANNEL_ID is set, upload ONLY to channel, not user chat
         if PyroConf.FORWARD_CHANNEL_ID != 0:
@@ -626,14 +893,15 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
             LOGGER(__name__).info(f"Uploading media group directly to channel {target_chat_id}")
             
             try:
-                sent_messages = await bot.send_media_group(chat_id=target_chat_id, media=valid_media)
+                sent_messages = await send_album(target_chat_id)
                 # Capture message IDs for bin channel forwarding
                 if sent_messages:
                     sent_message_ids = [msg.id for msg in sent_messages]
+                    await remember_uploads(sent_messages)
                 LOGGER(__name__).info(f"Successfully uploaded media group to channel {target_chat_id}")
                 if not is_batch:
                     await message.reply(f"✅ Media group ({len(valid_media)} items) uploaded to channel successfully!")
-                await progress_message.delete()
+                await finish_progress(progress_message)
             except Exception as e:
                 error_msg = str(e)
                 LOGGER(__name__).error(f"Failed to upload media group to channel: {error_msg}")
@@ -643,11 +911,12 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                     LOGGER(__name__).info("Detected Pyrogram 'topics' bug - upload likely succeeded")
                     if not is_batch:
                         await message.reply(f"✅ Media group ({len(valid_media)} items) uploaded to channel!")
-                    await progress_message.delete()
+                    await finish_progress(progress_message)
                     # Note: We can't get message IDs when topics bug happens, so bin channel forwarding
                     # will fall back to re-uploading. This is a Pyrogram bug workaround.
                     LOGGER(__name__).info("Bin channel will use re-upload method (no message IDs available)")
                 else:
+                    dropped = await refresh_cached()
                     # Try individual uploads as fallback for real errors
                     if not is_batch:
                         await message.reply(
@@ -655,7 +924,7 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                         )
                     
                     success_count = 0
-                    fail_count = 0
+                    fail_count = dropped
                     for media in valid_media:
                         try:
                             # Add small delay between uploads to avoid flood limits
@@ -668,24 +937,32 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                                     chat_id=target_chat_id,
                                     photo=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, InputMediaVideo):
                                 sent_msg = await bot.send_video(
                                     chat_id=target_chat_id,
                                     video=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, InputMediaDocument):
                                 sent_msg = await bot.send_document(
                                     chat_id=target_chat_id,
                                     document=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, InputMediaAudio):
                                 sent_msg = await bot.send_audio(
                                     chat_id=target_chat_id,
                                     audio=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             if sent_msg:
                                 sent_message_ids.append(sent_msg.id)
@@ -694,6 +971,7 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                             fail_count += 1
                             LOGGER(__name__).error(f"Failed individual upload: {individual_e}")
                     
+                    delivered = fail_count == 0
                     if not is_batch:
                         if fail_count == 0:
                             await message.reply(f"✅ All {success_count} items uploaded to channel individually!")
@@ -701,15 +979,16 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                             await message.reply(
                                 f"⚠️ Uploaded {success_count} items, failed {fail_count} items to channel"
                             )
-                    await progress_message.delete()
+                    await finish_progress(progress_message)
         else:
             # No forward channel configured, upload to user chat as before
             upload_chat_id = message.chat.id
             try:
-                sent_messages = await bot.send_media_group(chat_id=message.chat.id, media=valid_media)
+                sent_messages = await send_album(message.chat.id)
                 if sent_messages:
                     sent_message_ids = [msg.id for msg in sent_messages]
-                await progress_message.delete()
+                    await remember_uploads(sent_messages)
+                await finish_progress(progress_message)
             except Exception as e:
                 error_msg = str(e)
                 LOGGER(__name__).error(f"Failed to send media group to user: {error_msg}")
@@ -717,8 +996,10 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                 # Check if this is the Pyrogram 'topics' bug - upload actually succeeded
                 if "topics" in error_msg.lower() or "missing 1 required keyword-only argument" in error_msg:
                     LOGGER(__name__).info("Detected Pyrogram 'topics' bug - upload likely succeeded")
-                    await progress_message.delete()
+                    await finish_progress(progress_message)
                 else:
+                    if await refresh_cached():
+                        delivered = False
                     await message.reply(
                         f"⚠️ Media group upload failed ({error_msg}), trying individual uploads..."
                     )
@@ -735,38 +1016,49 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
                                     chat_id=message.chat.id,
                                     photo=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, InputMediaVideo):
                                 sent_msg = await bot.send_video(
                                     chat_id=message.chat.id,
                                     video=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, InputMediaDocument):
                                 sent_msg = await bot.send_document(
                                     chat_id=message.chat.id,
                                     document=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, InputMediaAudio):
                                 sent_msg = await bot.send_audio(
                                     chat_id=message.chat.id,
                                     audio=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             elif isinstance(media, Voice):
                                 sent_msg = await bot.send_voice(
                                     chat_id=message.chat.id,
                                     voice=media.media,
                                     caption=media.caption,
+                                    progress=report_progress,
+                                    progress_args=upload_args(),
                                 )
                             if sent_msg:
                                 sent_message_ids.append(sent_msg.id)
                             success_count += 1
                         except Exception as individual_e:
+                            delivered = False
                             LOGGER(__name__).error(f"Failed individual upload to user: {individual_e}")
 
-                    await progress_message.delete()
+                    await finish_progress(progress_message)
 
         # Forward to bin channel if configured - use instant copy if we have message IDs
         if sent_message_ids and upload_chat_id:
@@ -782,9 +1074,9 @@ async def processMediaGroup(chat_message, bot, message, is_batch=False, user_cli
 
         for path in temp_paths + invalid_paths:
             cleanup_download(path)
-        return True
+        return delivered
 
-    await progress_message.delete()
+    await finish_progress(progress_message)
     await message.reply("❌ No valid media found in the media group.")
     for path in invalid_paths:
         cleanup_download(path)
@@ -6,8 +6,9 @@ import shutil
 import psutil
 import asyncio
 from time import time
+from uuid import uuid4
+from contextlib import aclosing, nullcontext
 
-from pyleaves import Leaves
 from pyrogram.enums import ParseMode
 from pyrogram import Client, filters
 from pyrogram.errors import PeerIdInvalid, BadRequest, ChatAdminRequired, ChatWriteForbidden
@@ -15,8 +16,14 @@ from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.enums import ChatMemberStatus
 
 from helpers.utils import (
+    cache_sent_file,
+    copy_to_target,
     processMediaGroup,
+    finish_progress,
+    open_progress,
     progressArgs,
+    report_progress,
+    send_cached_file,
     send_media
 )
 
@@ -31,10 +38,22 @@ from helpers.files import (
 from helpers.msg import (
     getChatMsgID,
     get_file_name,
-    get_parsed_msg
+    get_media,
+    get_parsed_msg,
+    prefetch_messages,
+    MAX_MESSAGES_PER_REQUEST
 )
 
+from helpers.stream import send_streamed_media
 from helpers.database import init_database, get_database
+from helpers.media_tools import media_tools
+from helpers.file_cache import init_file_cache, get_file_cache
+from helpers.ratelimit import init_rate_controller, get_rate_controller
+from helpers.transfer import init_transfer_budget, get_transfer_budget, reserve_transfer, stage_download
+from helpers.scheduler import init_scheduler
+from helpers.jobs import current_job, job_registry, run_in_job
+from helpers.progress import progress_service
+from helpers.bandwidth import MB, bandwidth_shaper
 from helpers.session_manager import (
     init_session_manager, 
     get_session_manager, 
@@ -59,18 +78,38 @@ bot = Client(
 # Global session manager reference
 session_mgr = None
 
+# Fair-share download scheduler (created in initialize)
+scheduler = None
+
 RUNNING_TASKS = set()
-download_semaphore = None
 
-def track_task(coro):
+# Batch job IDs currently being processed (to avoid resuming a job twice)
+ACTIVE_BATCH_JOBS = set()
+
+def track_task(coro, job=None):
     task = asyncio.create_task(coro)
     RUNNING_TASKS.add(task)
     def _remove(_):
         RUNNING_TASKS.discard(task)
     task.add_done_callback(_remove)
+    # Attribute the task to its job (by default the job of the caller) for /cancel <id>
+    job = job or current_job.get()
+    if job:
+        job.add_task(task)
     return task
 
 
+def start_link_job(bot: Client, message: Message, post_url: str):
+    """Register a single-link download as a job and start it"""
+    job = job_registry.create(message.from_user.id, "dl", post_url)
+    return track_task(run_in_job(job, handle_download(bot, message, post_url)), job)
+
+
+def is_admin_user(user_id: int) -> bool:
+    """Whether the user may manage other users' jobs and bandwidth limits (everyone, if ADMIN_ID is unset)"""
+    return PyroConf.ADMIN_ID == 0 or user_id == PyroConf.ADMIN_ID
+
+
 def get_user_client(user_id: int = None):
     """Get the appropriate user client for downloads"""
     global session_mgr
@@ -85,6 +124,48 @@ def get_user_client(user_id: int = None):
     return None
 
 
+async def resolve_chat_client(user_id: int, chat_id, probe):
+    """
+    Run `await probe(client)` with the session that should serve a chat.
+
+    Users with their own session always use it; everyone else is served by the
+    least-loaded pool session that can see the chat.
+
+    Returns:
+        (client, result), or (None, None) if no session is available
+    """
+    own_client = session_mgr.get_user_client(user_id) if session_mgr else None
+    if own_client:
+        return own_client, await probe(own_client)
+    if session_mgr:
+        return await session_mgr.find_pool_client(chat_id, probe)
+    return None, None
+
+
+async def get_batch_clients(user_id: int, chat_id) -> list:
+    """
+    Pick the sessions that walk a /bdl range (also warms their peer cache for the chat).
+
+    Users with their own session use only it. Otherwise, with BATCH_SHARDING enabled,
+    every pool session that can see the chat gets a shard of the range.
+    """
+    if session_mgr and not session_mgr.get_user_client(user_id) and PyroConf.BATCH_SHARDING:
+        clients = await session_mgr.find_pool_clients(chat_id, lambda client: client.get_chat(chat_id))
+        if clients:
+            return clients
+
+    try:
+        client, _ = await resolve_chat_client(user_id, chat_id, lambda client: client.get_chat(chat_id))
+    except Exception:
+        client = None
+    return [client or get_user_client(user_id)]
+
+
+def lease_client(client):
+    """Count a transfer against a pool session while the block runs"""
+    return session_mgr.lease(client) if session_mgr else nullcontext()
+
+
 @bot.on_message(filters.command("start") & filters.private)
 async def start(_, message: Message):
     LOGGER(__name__).info(f"Received /start from user {message.from_user.id}")
@@ -124,7 +205,13 @@ async def help_command(_, message: Message):
         "➤ **Batch Download**\n"
         "   – Send `/bdl start_link end_link` to grab a series of posts in one go.\n"
         "     💡 Example: `/bdl https://t.me/mychannel/100 https://t.me/mychannel/120`\n"
-        "**It will download all posts from ID 100 to 120.**\n\n"
+        "**It will download all posts from ID 100 to 120.**\n"
+        "   – Send `/resume` (or `/resume <job_id>`) to continue an interrupted batch.\n\n"
+        "➤ **Jobs**\n"
+        "   – `/jobs` - List your running downloads\n"
+        "   – `/job <id>` - Show progress, speed and ETA of a job\n"
+        "   – `/cancel <id>` - Stop one job without touching the others\n"
+        "   – `/bandwidth` - Show or set bandwidth limits (admin only)\n\n"
         "➤ **Requirements**\n"
         "   – You must be logged in (`/login`) to access restricted chats.\n\n"
         "➤ **If the bot hangs**\n"
@@ -199,7 +286,16 @@ async def session_command(_, message: Message):
 
 @bot.on_message(filters.command("cancel") & filters.private)
 async def cancel_command(_, message: Message):
-    """Cancel ongoing login process"""
+    """Cancel a job (`/cancel <job_id>`) or the ongoing login process"""
+    if len(message.command) > 1:
+        job = job_registry.get(message.command[1])
+        if not job or (job.owner != message.from_user.id and not is_admin_user(message.from_user.id)):
+            await message.reply(f"❌ **No running job `{message.command[1]}` found.**")
+            return
+        cancelled = job.cancel()
+        await message.reply(f"🛑 **Cancelling job `{job.job_id}`** ({cancelled} running task(s)).")
+        return
+
     global session_mgr
     if not session_mgr:
         await message.reply("❌ **Session manager not initialized.**")
@@ -255,40 +351,73 @@ async def handle_download(bot: Client, message: Message, post_url: str, is_batch
     Args:
         is_batch: If True, suppress individual confirmation messages (for batch downloads)
     """
-    async with download_semaphore:
-        if "?" in post_url:
-            post_url = post_url.split("?", 1)[0]
+    if "?" in post_url:
+        post_url = post_url.split("?", 1)[0]
 
-        # Get user client for this user or primary client
-        user_client = get_user_client(message.from_user.id)
-        
-        if not user_client:
-            await message.reply(
-                "❌ **No active session found!**\n\n"
-                "Please use `/login` to connect your Telegram account first.\n"
-                "This is required to access chats and download media."
-            )
-            return
+    # Get user client for this user or primary client
+    user_client = get_user_client(message.from_user.id)
+    
+    if not user_client:
+        await message.reply(
+            "❌ **No active session found!**\n\n"
+            "Please use `/login` to connect your Telegram account first.\n"
+            "This is required to access chats and download media."
+        )
+        return
 
-        try:
-            chat_id, message_id = getChatMsgID(post_url)
-            chat_message = await user_client.get_messages(chat_id=chat_id, message_ids=message_id)
+    try:
+        chat_id, message_id = getChatMsgID(post_url)
+        # Use the user's own session, or the least-loaded pool session that can see the chat
+        user_client, chat_message = await resolve_chat_client(
+            message.from_user.id,
+            chat_id,
+            lambda client: client.get_messages(chat_id=chat_id, message_ids=message_id),
+        )
+    except (PeerIdInvalid, BadRequest, KeyError):
+        await message.reply(
+            "**Make sure you are logged in and part of the chat.**\n\n"
+            "Use `/login` to connect your Telegram account."
+        )
+        return
+    except ValueError as e:
+        # URL parsing errors - log but don't spam the user
+        LOGGER(__name__).debug(f"URL parsing error: {e}")
+        return
+    except Exception as e:
+        error_message = f"**❌ {str(e)}**"
+        await message.reply(error_message)
+        LOGGER(__name__).error(f"Download error: {e}")
+        return
 
-            LOGGER(__name__).info(f"Downloading media from URL: {post_url}")
+    LOGGER(__name__).info(f"Downloading media from URL: {post_url}")
+    await handle_message_download(bot, message, chat_message, user_client, is_batch=is_batch)
 
-            if chat_message.document or chat_message.video or chat_message.audio:
-                file_size = (
-                    chat_message.document.file_size
-                    if chat_message.document
-                    else chat_message.video.file_size
-                    if chat_message.video
-                    else chat_message.audio.file_size
-                )
 
-                if not await fileSizeLimit(
-                    file_size, message, "download", user_client.me.is_premium
-                ):
-                    return
+async def handle_message_download(
+    bot: Client, message: Message, chat_message: Message, user_client: Client, is_batch: bool = False
+):
+    """
+    Download and deliver an already-fetched post.
+
+    Args:
+        chat_message: The source post, fetched with user_client
+        user_client: The user client that fetched chat_message
+        is_batch: If True, suppress individual confirmation messages (for batch downloads)
+
+    Returns:
+        bool: True if the post was delivered, False if it failed (errors are reported, not raised)
+    """
+    # Single links get the interactive lane; users share the slots round-robin.
+    # The file size is known before downloading, so small files can be packed around large ones.
+    source_media = get_media(chat_message)
+    slot = scheduler.slot(
+        message.from_user.id,
+        interactive=not is_batch,
+        size=getattr(source_media, "file_size", None) or 0,
+    )
+    async with lease_client(user_client), slot:
+        try:
+            message_id = chat_message.id
 
             parsed_caption = await get_parsed_msg(
                 chat_message.caption or "", chat_message.caption_entities
@@ -308,36 +437,20 @@ async def handle_download(bot: Client, message: Message, post_url: str, is_batch
                 if not await processMediaGroup(chat_message, bot, message, is_batch=is_batch, user_client=user_client):
                     if not is_batch:
                         await message.reply(
-                            "**Could not extract any valid media from the media group.**"
+                            "**Could not deliver every item of the media group.**"
                         )
-                return
+                    return False
+                return True
 
-            elif chat_message.media:
-                start_time = time()
-                progress_message = await message.reply("**📥 Downloading Progress...**")
-
-                filename = get_file_name(message_id, chat_message)
-                download_path = get_download_path(message.id, filename)
+            elif chat_message.media and source_media:
+                # Fast path: server-side copy when the source allows it
+                if await copy_to_target(bot, chat_message, message, is_batch=is_batch):
+                    return True
 
-                media_path = await chat_message.download(
-                    file_name=download_path,
-                    progress=Leaves.progress_for_pyrogram,
-                    progress_args=progressArgs(
-                        "📥 Downloading Progress", progress_message, start_time
-                    ),
-                )
-
-                if not media_path or not os.path.exists(media_path):
-                    await progress_message.edit("**❌ Download failed: File not saved properly**")
-                    return
-
-                file_size = os.path.getsize(media_path)
-                if file_size == 0:
-                    await progress_message.edit("**❌ Download failed: File is empty**")
-                    cleanup_download(media_path)
-                    return
-
-                LOGGER(__name__).info(f"Downloaded media: {media_path} (Size: {file_size} bytes)")
+                # Re-send by cached file_id if this file was uploaded before
+                source_unique_id = source_media.file_unique_id if source_media else None
+                if await send_cached_file(bot, message, source_unique_id, parsed_caption, is_batch=is_batch):
+                    return True
 
                 media_type = (
                     "photo"
@@ -348,19 +461,83 @@ async def handle_download(bot: Client, message: Message, post_url: str, is_batch
                     if chat_message.audio
                     else "document"
                 )
-                await send_media(
-                    bot,
-                    message,
-                    media_path,
-                    media_type,
-                    parsed_caption,
-                    progress_message,
-                    start_time,
-                    is_batch=is_batch,
-                )
 
-                cleanup_download(media_path)
-                await progress_message.delete()
+                # Size limits only apply once the file has to be transferred (copies are exempt).
+                # The bot uploads without Premium: refuse before transferring anything
+                file_size = getattr(source_media, "file_size", None) or 0
+                if not await fileSizeLimit(file_size, message, "download", user_client.me.is_premium):
+                    return False
+                if not await fileSizeLimit(file_size, message, "upload"):
+                    return False
+
+                start_time = time()
+                progress_message = await open_progress(message, "**📥 Downloading Progress...**", is_batch)
+
+                # Streaming mode: pipe the download straight into the upload, no disk staging
+                if PyroConf.STREAM_MODE and media_type != "photo":
+                    streamed = False
+                    # A stream holds a transfer slot but writes nothing to disk
+                    async with reserve_transfer(getattr(source_media, "file_size", None), on_disk=False):
+                        try:
+                            sent_msg = await send_streamed_media(
+                                bot,
+                                message,
+                                chat_message,
+                                media_type,
+                                parsed_caption,
+                                progress_message,
+                                start_time,
+                                is_batch=is_batch,
+                            )
+                            streamed = True
+                        except Exception as e:
+                            LOGGER(__name__).warning(f"Streaming failed, falling back to download/upload: {e}")
+                    if streamed:
+                        await cache_sent_file(source_unique_id, sent_msg)
+                        await finish_progress(progress_message)
+                        return True
+
+                filename = get_file_name(message_id, chat_message)
+                download_path = get_download_path(message.id, filename)
+
+                async with reserve_transfer(getattr(source_media, "file_size", None)):
+                    media_path = await chat_message.download(
+                        file_name=download_path,
+                        progress=report_progress,
+                        progress_args=progressArgs(
+                            "📥 Downloading Progress", progress_message, start_time
+                        ),
+                    )
+                if not media_path or not os.path.exists(media_path):
+                    await finish_progress(progress_message, "**❌ Download failed: File not saved properly**")
+                    return False
+
+                stage_download(media_path, getattr(source_media, "file_size", None))
+                try:
+                    file_size = os.path.getsize(media_path)
+                    if file_size == 0:
+                        await finish_progress(progress_message, "**❌ Download failed: File is empty**")
+                        return False
+
+                    LOGGER(__name__).info(f"Downloaded media: {media_path} (Size: {file_size} bytes)")
+
+                    sent_msg = await send_media(
+                        bot,
+                        message,
+                        media_path,
+                        media_type,
+                        parsed_caption,
+                        progress_message,
+                        start_time,
+                        is_batch=is_batch,
+                        source_message=chat_message,
+                    )
+                    await cache_sent_file(source_unique_id, sent_msg)
+                finally:
+                    cleanup_download(media_path)
+                await finish_progress(progress_message)
+                # send_media reports upload errors itself and returns a falsy message
+                return bool(sent_msg)
 
             elif chat_message.text or chat_message.caption:
                 text_content = parsed_text or parsed_caption
@@ -380,13 +557,21 @@ async def handle_download(bot: Client, message: Message, post_url: str, is_batch
                             LOGGER(__name__).error(f"Failed to forward text to channel: {e}")
                             if not is_batch:
                                 await message.reply(f"❌ Failed to forward text to channel: {e}")
+                            return False
                     else:
                         # No channel configured, send to user chat (but skip in batch mode)
                         if not is_batch:
                             await message.reply(text_content)
                         LOGGER(__name__).info(f"Text sent to user chat (no forward channel configured)")
+                return True
+            elif chat_message.media:
+                # Nothing to download (poll, dice, location, contact, ...): copy it if possible, else skip
+                if not await copy_to_target(bot, chat_message, message, is_batch=is_batch):
+                    LOGGER(__name__).debug(f"Skipping message {message_id}: no downloadable media")
+                return True
             else:
                 await message.reply("**No media or text found in the post URL.**")
+                return False
 
         except (PeerIdInvalid, BadRequest, KeyError):
             await message.reply(
@@ -400,6 +585,7 @@ async def handle_download(bot: Client, message: Message, post_url: str, is_batch
             error_message = f"**❌ {str(e)}**"
             await message.reply(error_message)
             LOGGER(__name__).error(f"Download error: {e}")
+        return False
 
 
 @bot.on_message(filters.command("dl") & filters.private)
@@ -409,7 +595,7 @@ async def download_media(bot: Client, message: Message):
         return
 
     post_url = message.command[1]
-    await track_task(handle_download(bot, message, post_url))
+    await start_link_job(bot, message, post_url)
 
 
 @bot.on_message(filters.command("bdl") & filters.private)
@@ -445,94 +631,266 @@ async def download_range(bot: Client, message: Message):
     if start_id > end_id:
         return await message.reply("**❌ Invalid range: start ID cannot exceed end ID.**")
 
-    try:
-        await user_client.get_chat(start_chat)
-    except Exception:
-        pass
+    job = {
+        "job_id": uuid4().hex[:8],
+        "user_id": message.from_user.id,
+        "source_chat": start_chat,
+        "start_id": start_id,
+        "end_id": end_id,
+        "done_ids": [],
+        "done_groups": [],
+        "counters": {"downloaded": 0, "skipped": 0, "not_found": 0},
+    }
+    db = get_database()
+    if db and db.is_connected:
+        await db.create_batch_job(job)
+
+    registry_job = job_registry.create(
+        message.from_user.id, "bdl", str(start_chat), start_id, end_id, job_id=job["job_id"]
+    )
+    clients = await get_batch_clients(message.from_user.id, start_chat)
+    await run_in_job(registry_job, run_batch(bot, message, clients, job))
 
-    prefix = args[1].rsplit("/", 1)[0]
-    loading = await message.reply(f"📥 **Downloading posts {start_id}–{end_id}…**")
 
-    downloaded = skipped = failed = not_found = 0
+@bot.on_message(filters.command("resume") & filters.private)
+async def resume_batch(bot: Client, message: Message):
+    """Resume an interrupted /bdl job from its last checkpoint"""
+    db = get_database()
+    if not db or not db.is_connected:
+        await message.reply("❌ **Database not connected.** Batch jobs cannot be resumed.")
+        return
+
+    job_id = message.command[1] if len(message.command) > 1 else None
+    job = await db.get_resumable_batch_job(message.from_user.id, job_id)
+    if not job:
+        await message.reply("❌ **No interrupted batch job found.**")
+        return
+    if job["job_id"] in ACTIVE_BATCH_JOBS:
+        await message.reply(f"⚠️ **Batch job `{job['job_id']}` is already running.**")
+        return
+
+    user_client = get_user_client(message.from_user.id)
+    if not user_client:
+        await message.reply(
+            "❌ **No active session found!**\n\n"
+            "Please use `/login` to connect your Telegram account first."
+        )
+        return
+
+    await db.set_batch_job_status(job["job_id"], "running")
+    registry_job = job_registry.create(
+        message.from_user.id, "bdl", str(job["source_chat"]), job["start_id"], job["end_id"], job_id=job["job_id"]
+    )
+    clients = await get_batch_clients(message.from_user.id, job["source_chat"])
+    await run_in_job(registry_job, run_batch(bot, message, clients, job))
+
+
+async def run_batch(bot: Client, message: Message, clients: list, job: dict):
+    """
+    Download a range of posts, checkpointing every delivered post to the batch job journal.
+
+    Posts and media groups already recorded in the job's done_ids / done_groups are skipped,
+    so the same function starts new jobs and resumes interrupted ones.
+
+    With several sessions in `clients`, the range is split into interleaved shards of
+    prefetch chunks; each session walks its own shard and all shards share one summary.
+    """
+    job_id = job["job_id"]
+    start_chat, start_id, end_id = job["source_chat"], job["start_id"], job["end_id"]
+    done_ids = set(job.get("done_ids", []))
+    message_ids = [msg_id for msg_id in range(start_id, end_id + 1) if msg_id not in done_ids]
+
+    db = get_database()
+    journal = db if db and db.is_connected else None
+
+    # Shard i gets prefetch chunks i, i + n, i + 2n, ... so every session starts right away
+    chunks = [
+        message_ids[i:i + MAX_MESSAGES_PER_REQUEST]
+        for i in range(0, len(message_ids), MAX_MESSAGES_PER_REQUEST)
+    ]
+    clients = clients[:max(1, len(chunks))]
+    shards = [
+        (client, [msg_id for chunk in chunks[index::len(clients)] for msg_id in chunk])
+        for index, client in enumerate(clients)
+    ]
+
+    shard_note = f" across {len(shards)} sessions" if len(shards) > 1 else ""
+    if done_ids:
+        loading = await message.reply(
+            f"📥 **Resuming batch `{job_id}`: {len(message_ids)} post(s) left in {start_id}–{end_id}{shard_note}…**"
+        )
+    else:
+        loading = await message.reply(
+            f"📥 **Downloading posts {start_id}–{end_id}{shard_note}…** (job `{job_id}`)"
+        )
+
+    counters = job.get("counters", {})
+    downloaded = counters.get("downloaded", 0)
+    skipped = counters.get("skipped", 0)
+    not_found = counters.get("not_found", 0)
+    failed = 0
     failed_ids = []  # Track which post IDs failed
-    batch_tasks = []
-    batch_msg_ids = []  # Track message IDs for current batch
-    BATCH_SIZE = PyroConf.BATCH_SIZE
+    unsaved_ids = []  # Skipped / missing post IDs not yet checkpointed
+    BATCH_SIZE = max(1, PyroConf.BATCH_SIZE)
     
-    # Track processed media groups to avoid duplicate downloads
-    processed_media_groups = set()
+    # Track processed media groups to avoid duplicate downloads (shared by all shards)
+    processed_media_groups = set(job.get("done_groups", []))
+
+    # Progress shown by /jobs and /job (posts handled in this run only)
+    registry_job = current_job.get()
+    posts_before = downloaded + skipped + not_found
+    if registry_job:
+        registry_job.posts_total = len(message_ids)
+        registry_job.stage = "fetching posts"
+
+    def render_batch() -> str:
+        """Aggregate progress of the whole batch, shown instead of one message per post"""
+        text = (
+            f"📥 **Batch `{job_id}`: posts {start_id}–{end_id}{shard_note}**\n\n"
+            f"✅ `{downloaded}` downloaded | ⏭️ `{skipped}` skipped | "
+            f"🔍 `{not_found}` not found | ❌ `{failed}` failed"
+        )
+        if registry_job:
+            eta = registry_job.eta
+            text += (
+                f"\n📊 `{registry_job.posts_done}/{registry_job.posts_total}` posts | "
+                f"`{get_readable_file_size(registry_job.bytes_done)}` at "
+                f"`{get_readable_file_size(registry_job.throughput)}/s`"
+            )
+            if eta is not None:
+                text += f" | ETA `{get_readable_time(int(eta))}`"
+        return text
 
-    for msg_id in range(start_id, end_id + 1):
-        url = f"{prefix}/{msg_id}"
-        try:
-            chat_msg = await user_client.get_messages(chat_id=start_chat, message_ids=msg_id)
-            
-            # Check if message doesn't exist (empty message)
-            if not chat_msg or chat_msg.empty:
-                not_found += 1
-                LOGGER(__name__).debug(f"Message {msg_id} does not exist")
-                continue
-            
-            # Skip if this message is part of a media group we've already processed
-            if chat_msg.media_group_id:
-                if chat_msg.media_group_id in processed_media_groups:
-                    LOGGER(__name__).debug(f"Skipping message {msg_id} - media group {chat_msg.media_group_id} already processed")
-                    skipped += 1
-                    continue
-                # Mark this media group as being processed
-                processed_media_groups.add(chat_msg.media_group_id)
-                LOGGER(__name__).info(f"Processing media group {chat_msg.media_group_id} starting from message {msg_id}")
-
-            has_media = bool(chat_msg.media_group_id or chat_msg.media)
-            has_text  = bool(chat_msg.text or chat_msg.caption)
-            if not (has_media or has_text):
-                skipped += 1
-                continue
-
-            # Pass is_batch=True to suppress individual confirmation messages
-            task = track_task(handle_download(bot, message, url, is_batch=True))
-            batch_tasks.append(task)
-            batch_msg_ids.append(msg_id)
-
-            if len(batch_tasks) >= BATCH_SIZE:
-                results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                for i, result in enumerate(results):
-                    if isinstance(result, asyncio.CancelledError):
-                        await loading.delete()
-                        return await message.reply(
-                            f"**❌ Batch canceled** after downloading `{downloaded}` posts."
-                        )
-                    elif isinstance(result, Exception):
-                        failed += 1
-                        failed_ids.append(batch_msg_ids[i])
-                        LOGGER(__name__).error(f"Error at post {batch_msg_ids[i]}: {result}")
-                    else:
-                        downloaded += 1
+    progress_service.watch(loading, render_batch)
 
-                batch_tasks.clear()
-                batch_msg_ids.clear()
-                await asyncio.sleep(PyroConf.FLOOD_WAIT_DELAY)
+    async def checkpoint(delivered_ids: list, delivered_groups: list):
+        """Persist delivered post IDs together with any buffered skipped IDs"""
+        if registry_job:
+            registry_job.posts_done = downloaded + skipped + not_found + failed - posts_before
+        if not journal:
+            return
+        ids = unsaved_ids + delivered_ids
+        unsaved_ids.clear()
+        await journal.checkpoint_batch_job(
+            job_id,
+            ids,
+            delivered_groups,
+            {"downloaded": downloaded, "skipped": skipped, "not_found": not_found},
+        )
 
-        except Exception as e:
-            # Check if error indicates message doesn't exist
-            error_str = str(e).lower()
-            if "message" in error_str and ("not found" in error_str or "empty" in error_str or "invalid" in error_str):
-                not_found += 1
-            else:
-                failed += 1
-                failed_ids.append(msg_id)
-                LOGGER(__name__).error(f"Error at {url}: {e}")
-
-    if batch_tasks:
-        results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                failed += 1
-                failed_ids.append(batch_msg_ids[i])
-            else:
-                downloaded += 1
+    async def drain(pending: dict, limit: int) -> bool:
+        """Wait until at most `limit` posts are in flight. Returns False if the batch was cancelled."""
+        nonlocal downloaded, failed
+        while len(pending) > limit:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                msg_id, media_group_id = pending.pop(task)
+                if task.cancelled():
+                    for other in pending:
+                        other.cancel()
+                    return False
+                if task.exception() or not task.result():
+                    # Not checkpointed, so /resume retries the post
+                    failed += 1
+                    failed_ids.append(msg_id)
+                    LOGGER(__name__).error(f"Error at post {msg_id}: {task.exception() or 'not delivered'}")
+                else:
+                    downloaded += 1
+                    await checkpoint([msg_id], [media_group_id] if media_group_id else [])
+        return True
+
+    async def run_shard(user_client: Client, shard_ids: list) -> bool:
+        """Walk one shard with its own session and sliding window. Returns False if cancelled."""
+        nonlocal skipped, not_found, failed
+        pending = {}  # In-flight download tasks mapped to (post ID, media group ID)
+
+        # aclosing stops the prefetch task as soon as the loop exits, including on cancel
+        async with aclosing(prefetch_messages(user_client, start_chat, shard_ids)) as fetched:
+            async for chunk_ids, messages, error in fetched:
+                if error:
+                    # Check if error indicates messages don't exist
+                    error_str = str(error).lower()
+                    if "message" in error_str and ("not found" in error_str or "empty" in error_str or "invalid" in error_str):
+                        not_found += len(chunk_ids)
+                        unsaved_ids.extend(chunk_ids)
+                    else:
+                        failed += len(chunk_ids)
+                        failed_ids.extend(chunk_ids)
+                        LOGGER(__name__).error(f"Error fetching posts {chunk_ids[0]}–{chunk_ids[-1]}: {error}")
+                    continue
+
+                for chat_msg in messages:
+                    # Stop walking the range once /cancel <id> was used
+                    if registry_job and registry_job.cancelled:
+                        for task in pending:
+                            task.cancel()
+                        return False
+
+                    # Check if message doesn't exist (empty message)
+                    if not chat_msg or chat_msg.empty:
+                        not_found += 1
+                        if chat_msg:
+                            unsaved_ids.append(chat_msg.id)
+                        LOGGER(__name__).debug(f"Message {getattr(chat_msg, 'id', None)} does not exist")
+                        continue
+
+                    msg_id = chat_msg.id
+
+                    # Skip if this message is part of a media group we've already processed
+                    if chat_msg.media_group_id:
+                        if chat_msg.media_group_id in processed_media_groups:
+                            LOGGER(__name__).debug(f"Skipping message {msg_id} - media group {chat_msg.media_group_id} already processed")
+                            skipped += 1
+                            unsaved_ids.append(msg_id)
+                            continue
+                        # Mark this media group as being processed
+                        processed_media_groups.add(chat_msg.media_group_id)
+                        LOGGER(__name__).info(f"Processing media group {chat_msg.media_group_id} starting from message {msg_id}")
+
+                    has_media = bool(chat_msg.media_group_id or chat_msg.media)
+                    has_text  = bool(chat_msg.text or chat_msg.caption)
+                    if not (has_media or has_text):
+                        skipped += 1
+                        unsaved_ids.append(msg_id)
+                        continue
+
+                    # Keep BATCH_SIZE posts in flight, starting the next one as soon as any finishes
+                    if not await drain(pending, BATCH_SIZE - 1):
+                        return False
+
+                    # Pass is_batch=True to suppress individual confirmation messages
+                    task = track_task(
+                        handle_message_download(bot, message, chat_msg, user_client, is_batch=True)
+                    )
+                    pending[task] = (msg_id, chat_msg.media_group_id)
+
+                await checkpoint([], [])
+
+        return await drain(pending, 0)
+
+    ACTIVE_BATCH_JOBS.add(job_id)
+    try:
+        results = await asyncio.gather(
+            *(run_shard(client, shard_ids) for client, shard_ids in shards)
+        )
+        await checkpoint([], [])
+        if not all(results):
+            progress_service.forget(loading)
+            await loading.delete()
+            if journal:
+                await journal.set_batch_job_status(job_id, "cancelled")
+            return await message.reply(
+                f"**❌ Batch canceled** after downloading `{downloaded}` posts.\n"
+                f"Use `/resume {job_id}` to continue."
+            )
+    finally:
+        ACTIVE_BATCH_JOBS.discard(job_id)
 
+    progress_service.forget(loading)
     await loading.delete()
+    if journal:
+        # Jobs with failed posts stay resumable so /resume can retry them
+        await journal.set_batch_job_status(job_id, "incomplete" if failed_ids else "completed")
     
     # Build summary message based on channel mode
     if PyroConf.FORWARD_CHANNEL_ID != 0:
@@ -563,12 +921,14 @@ async def download_range(bot: Client, message: Message):
         else:
             failed_list = ", ".join(str(id) for id in failed_ids[:20]) + f"... (+{len(failed_ids) - 20} more)"
         summary += f"\n\n❌ **Failed Post IDs:** `{failed_list}`"
+        if journal:
+            summary += f"\n🔁 Use `/resume {job_id}` to retry them."
     
     await message.reply(summary)
 
 
 # List of all command names for the catch-all handler
-ALL_COMMANDS = ["start", "help", "dl", "stats", "logs", "killall", "channel", "setchannel", "clearchannel", "bdl", "ping", "login", "logout", "session", "cancel"]
+ALL_COMMANDS = ["start", "help", "dl", "stats", "logs", "killall", "channel", "setchannel", "clearchannel", "bdl", "resume", "jobs", "job", "bandwidth", "ping", "login", "logout", "session", "cancel"]
 
 @bot.on_message(filters.private & ~filters.command(ALL_COMMANDS) & ~filters.me)
 async def handle_any_message(bot: Client, message: Message):
@@ -584,7 +944,7 @@ async def handle_any_message(bot: Client, message: Message):
             # Check if it has a message ID (contains at least one slash after the domain)
             parts = text.replace("https://", "").replace("http://", "").split("/")
             if len(parts) >= 3:  # domain/channel/message_id
-                await track_task(handle_download(bot, message, text))
+                await start_link_job(bot, message, text)
         # Silently ignore non-URL messages - don't spam errors
 
 
@@ -608,6 +968,13 @@ async def stats(_, message: Message):
     if session_mgr:
         active_sessions = len(session_mgr.active_clients)
 
+    # Current adaptive API rates
+    rate_lines = ""
+    rate_controller = get_rate_controller()
+    if rate_controller:
+        for key, method_class, rate, flood_waits in rate_controller.get_stats():
+            rate_lines += f"**➜ {key}/{method_class}:** `{rate:.2f} req/s` ({flood_waits} FloodWait)\n"
+
     stats = (
         "**≧◉◡◉≦ Bot is Up and Running successfully.**\n\n"
         f"**➜ Bot Uptime:** `{currentTime}`\n"
@@ -622,6 +989,44 @@ async def stats(_, message: Message):
         f"**➜ RAM:** `{memory}%` | "
         f"**➜ DISK:** `{disk}%`"
     )
+    if session_mgr:
+        pool_lines = ""
+        for key, outstanding, flood_wait in session_mgr.get_pool_stats():
+            status = f"FloodWait {int(flood_wait)}s" if flood_wait > 0 else "ready"
+            pool_lines += f"**➜ {key}:** `{outstanding}` transfer(s), {status}\n"
+        if pool_lines:
+            stats += "\n\n**Session Pool:**\n" + pool_lines.rstrip("\n")
+    file_cache = get_file_cache()
+    if file_cache:
+        stats += f"\n\n**➜ File Cache:** `{file_cache.hits}` hit(s) | `{file_cache.misses}` miss(es)"
+    if scheduler:
+        queue = scheduler.get_stats()
+        stats += (
+            f"\n\n**➜ Download Slots:** `{queue['active']}/{queue['slots']}` busy "
+            f"(`{queue['active_large']}/{queue['large_slots']}` large) | "
+            f"`{queue['interactive_queued']}` link(s) and `{queue['batch_queued']}` batch post(s) queued "
+            f"from `{queue['users_waiting']}` user(s)"
+        )
+    transfer_budget = get_transfer_budget()
+    if transfer_budget:
+        budget = transfer_budget.get_stats()
+        stats += (
+            f"\n\n**➜ Transfers:** `{budget['active']}/{budget['max_transfers']}` active | "
+            f"`{get_readable_file_size(budget['in_flight_bytes'])}` of "
+            f"`{get_readable_file_size(budget['max_bytes'])}` in flight | `{budget['waiting']}` waiting\n"
+            f"**➜ Disk Reserved:** `{get_readable_file_size(budget['disk_reserved'])}` | "
+            f"`{get_readable_file_size(budget['disk_free'])}` free after margin"
+        )
+    tool_stats = media_tools.get_stats()
+    stats += (
+        f"\n\n**➜ Media Tools:** `{tool_stats['running']}` running | `{tool_stats['queued']}` queued "
+        f"(max `{tool_stats['max_queue_depth']}`) | `{tool_stats['completed']}` done, "
+        f"avg `{tool_stats['avg_run_time']:.1f}s` | `{tool_stats['timeouts']}` timeout(s)"
+    )
+    limits = bandwidth_shaper.get_limits()
+    stats += f"\n\n**➜ Bandwidth:** {format_rate(limits['global'])} total | {format_rate(limits['user'])} per user"
+    if rate_lines:
+        stats += "\n\n**API Rate Limits:**\n" + rate_lines
     await message.reply(stats)
 
 
@@ -639,6 +1044,115 @@ async def logs(_, message: Message):
         await message.reply("**Logs file not found.**")
 
 
+def format_job(job) -> str:
+    """One-line summary of a running job"""
+    if job.kind == "bdl":
+        target = f"`{job.source}` {job.start_id}–{job.end_id} ({job.posts_done}/{job.posts_total} posts)"
+    else:
+        target = job.source
+    return (
+        f"🔹 `{job.job_id}` **{job.kind}** {target}\n"
+        f"   {job.stage} | {get_readable_file_size(job.bytes_done)} at "
+        f"{get_readable_file_size(job.throughput)}/s"
+    )
+
+
+@bot.on_message(filters.command("jobs") & filters.private)
+async def list_jobs(_, message: Message):
+    """List running jobs (all jobs for the admin, own jobs otherwise)"""
+    owner = None if is_admin_user(message.from_user.id) else message.from_user.id
+    jobs = job_registry.list(owner)
+    if not jobs:
+        await message.reply("**No running jobs.**")
+        return
+    await message.reply(
+        f"**⚙️ Running Jobs ({len(jobs)}):**\n\n" + "\n".join(format_job(job) for job in jobs)
+        + "\n\nUse `/job <id>` for details or `/cancel <id>` to stop one."
+    )
+
+
+@bot.on_message(filters.command("job") & filters.private)
+async def job_status(_, message: Message):
+    """Show status, throughput and ETA of one job"""
+    if len(message.command) < 2:
+        await message.reply("**Provide a job ID after the /job command.**")
+        return
+    job = job_registry.get(message.command[1])
+    if not job or (job.owner != message.from_user.id and not is_admin_user(message.from_user.id)):
+        await message.reply(f"❌ **No running job `{message.command[1]}` found.**")
+        return
+
+    eta = job.eta
+    status = (
+        f"**⚙️ Job `{job.job_id}`**\n"
+        "━━━━━━━━━━━━━━━━━━━\n"
+        f"**➜ Type:** `{job.kind}`\n"
+        f"**➜ Owner:** `{job.owner}`\n"
+        f"**➜ Source:** `{job.source}`\n"
+    )
+    if job.kind == "bdl":
+        status += (
+            f"**➜ Range:** `{job.start_id}–{job.end_id}`\n"
+            f"**➜ Posts:** `{job.posts_done}/{job.posts_total}`\n"
+        )
+    status += (
+        f"**➜ Stage:** {job.stage}\n"
+        f"**➜ Transferred:** `{get_readable_file_size(job.bytes_done)}` of "
+        f"`{get_readable_file_size(job.bytes_total)}` started\n"
+        f"**➜ Speed:** `{get_readable_file_size(job.throughput)}/s`\n"
+        f"**➜ Running for:** `{get_readable_time(int(job.elapsed))}`\n"
+        f"**➜ ETA:** `{get_readable_time(int(eta)) if eta is not None else 'unknown'}`"
+    )
+    await message.reply(status)
+
+
+def format_rate(rate: float) -> str:
+    return f"{rate / MB:.1f} MB/s" if rate > 0 else "unlimited"
+
+
+@bot.on_message(filters.command("bandwidth") & filters.private)
+async def bandwidth_command(_, message: Message):
+    """Show or change bandwidth limits at runtime (admin only)"""
+    if len(message.command) < 3:
+        limits = bandwidth_shaper.get_limits()
+        overrides = "".join(
+            f"\n   – `{user_id}`: {format_rate(rate)}" for user_id, rate in limits["overrides"].items()
+        )
+        await message.reply(
+            "🚦 **Bandwidth Limits**\n\n"
+            f"**➜ Global:** {format_rate(limits['global'])}\n"
+            f"**➜ Per user:** {format_rate(limits['user'])}{overrides}\n\n"
+            "**Usage:**\n"
+            "• `/bandwidth global <MB/s>`\n"
+            "• `/bandwidth user <MB/s> [user_id]`\n"
+            "Use `0` for unlimited. Per-job speeds are shown by `/jobs`."
+        )
+        return
+
+    if not is_admin_user(message.from_user.id):
+        await message.reply("❌ **Only the admin can change bandwidth limits.**")
+        return
+
+    scope = message.command[1].lower()
+    try:
+        rate = float(message.command[2]) * MB
+        user_id = int(message.command[3]) if len(message.command) > 3 else None
+    except ValueError:
+        await message.reply("❌ **Invalid number.** Example: `/bandwidth global 50`")
+        return
+    if rate < 0 or scope not in ("global", "user"):
+        await message.reply("❌ **Usage:** `/bandwidth <global|user> <MB/s> [user_id]`")
+        return
+
+    if scope == "global":
+        bandwidth_shaper.set_global_limit(rate)
+        await message.reply(f"✅ **Global bandwidth limit:** {format_rate(rate)}")
+    else:
+        bandwidth_shaper.set_user_limit(rate, user_id)
+        target = f"user `{user_id}`" if user_id else "each user"
+        await message.reply(f"✅ **Bandwidth limit for {target}:** {format_rate(rate)}")
+
+
 @bot.on_message(filters.command("killall") & filters.private)
 async def cancel_all_tasks(_, message: Message):
     cancelled = 0
@@ -812,8 +1326,14 @@ async def clear_channel(_, message: Message):
 
 
 async def initialize():
-    global download_semaphore, session_mgr
-    download_semaphore = asyncio.Semaphore(PyroConf.MAX_CONCURRENT_DOWNLOADS)
+    global scheduler, session_mgr
+    scheduler = init_scheduler()
+    progress_service.start()
+    init_transfer_budget()
+
+    # Throttle Telegram API calls adaptively (bot here, user clients in the session manager)
+    rate_controller = init_rate_controller()
+    rate_controller.attach(bot, "bot")
     
     # Initialize database if MongoDB URI is configured
     if PyroConf.MONGO_URI:
@@ -826,6 +1346,10 @@ async def initialize():
     else:
         LOGGER(__name__).warning("MONGO_URI not configured. Session persistence is disabled.")
     
+    # Uploaded file cache (memory only if MongoDB is unavailable)
+    db = get_database()
+    init_file_cache(db if db and db.is_connected else None)
+    
     # Initialize session manager
     session_mgr = await init_session_manager()
     